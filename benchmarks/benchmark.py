@@ -0,0 +1,429 @@
+""" Performance benchmarks
+
+Measures the engine and the GUI hot paths, appends the results to a JSON
+history and compares every benchmark with its last run in the history on
+the same machine and Python. The history is local, it isn't committed:
+
+    python benchmarks/benchmark.py
+    python benchmarks/benchmark.py --only engine_turns games --no-save
+
+The GUI benchmarks run on the offscreen Qt platform and are skipped when
+PyQt5 is not installed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lib import board_data
+from lib import Dice
+from lib import GameEngine
+from lib import Player
+from lib import Strategy
+from lib import Trade
+from lib import tournament
+
+
+HISTORY_PATH = os.path.join(ROOT, "benchmarks", "history.json")
+# cold start of the headless runs, flagged above it whatever the history
+STARTUP_BUDGET_MS = 50
+BOT = Strategy.ReserveStrategy(buy_reserve = 100, build_reserve = 150)
+COLORS = ["#ff0000", "#00ff00", "#0000ff", "#ffff00"]
+
+
+def best_of(function, repeat = 5):
+    """ Shortest time of repeat calls, the least disturbed one
+
+    Returns:
+        seconds (float)
+    """
+
+    times = []
+
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def new_engine(nb_players = 4, seed = 0, board = None):
+    players = [Player.Player(f"bot-{seat}") for seat in range(nb_players)]
+    engine = GameEngine.GameEngine(
+        players, {player: BOT for player in players}, Dice.Dice(seed), board
+    )
+    engine.order_players()
+
+    return engine
+
+
+def bench_engine_turns(nb_turns = 20000):
+    """ Turns per second through the rules, a finished game is replaced
+    by a new one
+    """
+
+    def run():
+        engine = new_engine()
+
+        for turn in range(nb_turns):
+            if engine.is_over():
+                engine = new_engine(seed = turn)
+
+            engine.play_turn()
+
+    return nb_turns / best_of(run), "turns/s", True
+
+
+def bench_large_board(nb_tiles = 400, nb_players = 40, nb_turns = 20000):
+    """ Turns per second on an oversized variant of the board with many
+    players, the lookups must not grow with the board or the players
+    """
+
+    board = board_data.load_variant("classic", nb_tiles)
+
+    def run():
+        engine = new_engine(nb_players, board = board)
+
+        for turn in range(nb_turns):
+            if engine.is_over():
+                engine = new_engine(nb_players, turn, board)
+
+            engine.play_turn()
+
+    return nb_turns / best_of(run), "turns/s", True
+
+
+def bench_trade_scores(nb_turns = 300):
+    """ Offers scored per second by the trade evaluator, on the candidate
+    offers of a game where everything got bought
+    """
+
+    passive = tournament.BOTS["passive"]
+    players = [Player.Player(f"bot-{seat}") for seat in range(4)]
+    engine = GameEngine.GameEngine(players, {player: passive for player in players}, Dice.Dice(0))
+    engine.order_players()
+
+    for turn in range(nb_turns):
+        engine.play_turn()
+
+    evaluator = Trade.TradeEvaluator()
+    offers = [
+        offer for player in engine.ordered_players
+        for gain, offer in evaluator.candidates(engine, player)
+    ]
+
+    def run():
+        for offer in offers:
+            evaluator.score(engine, offer.proposer, offer)
+            evaluator.score(engine, offer.receiver, offer)
+
+    return 2 * len(offers) / best_of(run), "scores/s", True
+
+
+def bench_games(nb_games = 20):
+    """ Games per second played to the end or to the draw limit """
+
+    def run():
+        dice = Dice.Dice(0)
+
+        for game in range(nb_games):
+            tournament.play_game(["greedy", "builder"], dice.split(game), max_turns = 1000)
+
+    return nb_games / best_of(run, repeat = 3), "games/s", True
+
+
+def bench_startup():
+    """ Start of a new interpreter importing the tournament and playing
+    one turn, what a CLI run or a simulation worker pays before playing.
+    PyQt5 must not be loaded
+    """
+
+    code = (
+        "import sys; from lib import tournament, GameEngine, Player; "
+        "players = [Player.Player('a'), Player.Player('b')]; "
+        "engine = GameEngine.GameEngine(players); engine.order_players(); engine.play_turn(); "
+        "sys.exit('PyQt5' in sys.modules)"
+    )
+
+    def start():
+        if subprocess.run([sys.executable, "-c", code], cwd = ROOT).returncode:
+            raise RuntimeError("PyQt5 is imported by lib.tournament")
+
+    return best_of(start, repeat = 10) * 1000, "ms", False
+
+
+def gui_game(app, nb_turns = 200):
+    """ A GUI game advanced by bots without the popups, the dialogs opened
+    while creating it are closed as soon as they show
+
+    Returns:
+        Monopoly.Monopoly
+    """
+
+    from PyQt5.QtCore import QTimer
+
+    from lib import Monopoly
+
+    def close_dialogs():
+        dialog = app.activeModalWidget()
+
+        if dialog is not None:
+            dialog.done(0)
+
+    timer = QTimer()
+    timer.timeout.connect(close_dialogs)
+    timer.start(0)
+
+    player2color = {Player.Player(f"bot-{seat}"): color for seat, color in enumerate(COLORS)}
+    game = Monopoly.Monopoly(player2color, seed = 0)
+    timer.stop()
+
+    game.engine.listeners.remove(game.render_event)
+
+    for player in player2color:
+        game.engine.strategies[player] = BOT
+
+    for turn in range(nb_turns):
+        if game.engine.is_over():
+            break
+
+        game.engine.play_turn()
+
+    game.sync_board()
+    game.show()
+    app.processEvents()
+
+    return game
+
+
+def bench_board_init(app):
+    from lib import Board
+
+    player2color = {Player.Player(f"bot-{seat}"): color for seat, color in enumerate(COLORS)}
+
+    return best_of(lambda: Board.Board(player2color)) * 1000, "ms", False
+
+
+def bench_update_interface(app, number = 20):
+    game = gui_game(app)
+
+    def run():
+        for i in range(number):
+            game.update_interface()
+
+    return best_of(run) / number * 1000, "ms", False
+
+
+def bench_restart(app, repeat = 5):
+    """ New game on the board of a game in progress, the turns played
+    before are not timed
+    """
+
+    game = gui_game(app)
+    times = []
+
+    for i in range(repeat):
+        for turn in range(200):
+            if game.engine.is_over():
+                break
+
+            game.engine.play_turn()
+
+        game.sync_board()
+        start = time.perf_counter()
+        game.new_game()
+        times.append(time.perf_counter() - start)
+
+    return min(times) * 1000, "ms", False
+
+
+def bench_repaint(app, number = 5):
+    """ Render of the whole scene in an image of the size of the board """
+
+    from PyQt5.QtGui import QImage, QPainter
+
+    game = gui_game(app)
+    rect = game.scene.sceneRect()
+    image = QImage(int(rect.width()), int(rect.height()), QImage.Format_ARGB32_Premultiplied)
+
+    def run():
+        for i in range(number):
+            painter = QPainter(image)
+            game.scene.render(painter)
+            painter.end()
+
+    return best_of(run) / number * 1000, "ms", False
+
+
+ENGINE_BENCHMARKS = {
+    "engine_turns": bench_engine_turns,
+    "large_board": bench_large_board,
+    "trade_scores": bench_trade_scores,
+    "games": bench_games,
+    "startup": bench_startup,
+}
+
+GUI_BENCHMARKS = {
+    "board_init": bench_board_init,
+    "update_interface": bench_update_interface,
+    "restart": bench_restart,
+    "repaint": bench_repaint,
+}
+
+
+def run_benchmarks(names):
+    """ Run the chosen benchmarks
+
+    Returns:
+        dict of name: {"value", "unit", "higher_is_better"}
+    """
+
+    results = {}
+
+    def record(name, benchmark, *args):
+        value, unit, higher_is_better = benchmark(*args)
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:<20} {value:>12.3f} {unit}")
+
+    for name, benchmark in ENGINE_BENCHMARKS.items():
+        if name in names:
+            record(name, benchmark)
+
+    gui_names = [name for name in GUI_BENCHMARKS if name in names]
+
+    if gui_names:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+        try:
+            from PyQt5.QtWidgets import QApplication
+        except ImportError:
+            print(f"PyQt5 is not installed, skipping {', '.join(gui_names)}")
+            return results
+
+        app = QApplication.instance() or QApplication([])
+
+        for name in gui_names:
+            record(name, GUI_BENCHMARKS[name], app)
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd = ROOT, capture_output = True, text = True, check = True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+
+    with open(path) as history_file:
+        return json.load(history_file)
+
+
+def environment():
+    """ What a run is compared on, timings of other machines or Pythons
+    mean nothing
+    """
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "host": platform.node(),
+    }
+
+
+def compare(results, history, threshold):
+    """ Print the change of every benchmark against its last run in the
+    same environment
+
+    Returns:
+        regressions (list of str): benchmarks worse by more than threshold
+    """
+
+    regressions = []
+    current = environment()
+    history = [
+        run for run in history
+        if all(run.get(key) == value for key, value in current.items())
+    ]
+
+    for name, result in results.items():
+        baseline = next((run for run in reversed(history) if name in run["results"]), None)
+
+        if baseline is None:
+            continue
+
+        old = baseline["results"][name]["value"]
+        change = (result["value"] - old) / old
+
+        if not result["higher_is_better"]:
+            change = -change
+
+        flag = ""
+
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+
+        print(
+            f"{name:<20} {old:>12.3f} -> {result['value']:>12.3f} {change:+.1%}"
+            f" (baseline {baseline['commit']}, {baseline['date']}){flag}"
+        )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.splitlines()[0])
+    parser.add_argument(
+        "--only", nargs = "+", metavar = "NAME",
+        choices = list(ENGINE_BENCHMARKS) + list(GUI_BENCHMARKS),
+        default = list(ENGINE_BENCHMARKS) + list(GUI_BENCHMARKS),
+    )
+    parser.add_argument("--history", default = HISTORY_PATH)
+    parser.add_argument("--no-save", action = "store_true", help = "don't add this run to the history")
+    parser.add_argument(
+        "--threshold", type = float, default = 0.1,
+        help = "relative slowdown reported as a regression"
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only)
+    history = load_history(args.history)
+    print()
+    regressions = compare(results, history, args.threshold)
+
+    if "startup" in results and results["startup"]["value"] > STARTUP_BUDGET_MS:
+        print(f"startup over its budget of {STARTUP_BUDGET_MS} ms")
+        regressions.append("startup")
+
+    if not args.no_save:
+        history.append({
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": git_commit(),
+            **environment(),
+            "results": results,
+        })
+
+        with open(args.history, "w") as history_file:
+            json.dump(history, history_file, indent = 2)
+
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,195 +1,18 @@
 """ Monopoly game
 
 GUI done in PyQt5 using monopoly_core.py
+
+PyQt5 is only imported when the GUI starts, the tournaments and the
+other headless runs only load the rules of lib.
 """
 
 import argparse
-from functools import partial
+import os
 import sys
-import time
-
-from PyQt5.QtWidgets import (
-    QLineEdit,
-    QWidget,
-    QApplication,
-    QLabel,
-    QMainWindow,
-    QGridLayout,
-    QColorDialog,
-    QPushButton,
-    QStackedWidget,
-    QVBoxLayout,
-    QHBoxLayout,
-    QErrorMessage,
-)
-from PyQt5.QtGui import QColor 
-
-sys.path.append("lib")
-
-import lib.core
-from lib.Monopoly import Monopoly
-from lib.Player import Player
-
-
-class MainWindow(QMainWindow):
-    """ main window where i display the various widgets """
-
-    EXIT_CODE_REBOOT = 100
-
-    def __init__(self, debug: bool = False):
-        super().__init__()
-
-        self.debug = debug
-        self.setWindowTitle("Monopoly")
-        self.central_widget = QStackedWidget()
-
-        self.title_screen = TitleScreen()
-        self.title_screen.start_game.clicked.connect(self.choose_names)
-
-        self.setCentralWidget(self.central_widget)
-        self.central_widget.addWidget(self.title_screen)
-
-    def choose_names(self) -> None:
-        """ check the nb players field, open the names screen """
-
-        try:
-            nb_players = int(self.title_screen.nb_players.text())
-
-            if nb_players > 6:
-                error = QErrorMessage()
-                error.showMessage("Can't have more than 6 players")
-                error.exec_()
-                return
-            elif nb_players <= 0:
-                error = QErrorMessage()
-                error.showMessage("Are you kinding me?")
-                error.exec_()
-                return
-
-        except Exception as e:
-            error = QErrorMessage()
-            error.showMessage(f"{e}")
-            error.exec_()
-        else:
-            self.names_screen = NamesPlayers(nb_players)
-            self.central_widget.addWidget(self.names_screen)
-            self.central_widget.setCurrentWidget(self.names_screen)
-
-            self.names_screen.confirm_button.clicked.connect(self.create_players)
-
-    def create_players(self) -> None:
-        """ check the names fields, open the game screen """
-
-        players = {}
-
-        if self.names_screen.player_colors == []:
-            for i in range(len(self.names_screen.player_names)):
-                self.names_screen.player_colors.append("#FFFFFF")
-
-        for player, color in zip(
-            self.names_screen.player_names,
-            self.names_screen.player_colors
-        ):
-            name = player.text().strip()
-
-            if name == "":
-                error = QErrorMessage()
-                error.showMessage("Please give all players names")
-                error.exec_()
-                return
-            else:
-                names = [player.get_name() for player in players]
-                
-                if name in names:
-                    error = QErrorMessage()
-                    error.showMessage("2 players can't have the same name")
-                    error.exec_()
-                    return
-
-            players[Player(name)] = color
-
-        self.game = Monopoly(players, self.debug)
-        self.central_widget.addWidget(self.game)
-        self.central_widget.setCurrentWidget(self.game)
-
-
-class TitleScreen(QWidget):
-    """ title screen, ask how many players """
-
-    def __init__(self):
-        super().__init__()
-
-        main_layout = QVBoxLayout()
-        description_layout = QHBoxLayout()
-        nb_players_layout = QGridLayout()
-        button_layout = QHBoxLayout()
-
-        description = QLabel("Hallo, this is my Monopoly GUI game. 6 players max plz")
-        label = QLabel("How many players? :")
-        self.nb_players = QLineEdit()
-        self.start_game = QPushButton("Start game")
-
-        description_layout.addWidget(description)
-        nb_players_layout.addWidget(label, 2, 0)
-        nb_players_layout.addWidget(self.nb_players, 2, 1)
-        button_layout.addWidget(self.start_game)
-
-        for layout in [description_layout, nb_players_layout, button_layout]:
-            main_layout.addLayout(layout)
-
-        self.setLayout(main_layout)
-
-
-class NamesPlayers(QWidget):
-    """ name screen, ask the names of the players """
-
-    def __init__(self, nb_players):
-        super().__init__()
 
-        self.player_names = []
-        self.player_colors = []
-
-        main_layout = QVBoxLayout()
-        names_layout = QGridLayout()
-        button_layout = QHBoxLayout()
-
-        button_list = []
-
-        for i in range(nb_players):
-            label = QLabel("Name :")
-            player_name = QLineEdit()
-            color_button = QPushButton("Color")
-            color_button.setStyleSheet("background-color: white")
-            names_layout.addWidget(label, i, 0)
-            names_layout.addWidget(player_name, i, 1)
-            names_layout.addWidget(color_button, i, 2)
-            button_list.append(color_button)
-            self.player_names.append(player_name)
-            color_button.clicked.connect(partial(self.open_colordialog, color_button))
-
-        self.confirm_button = QPushButton("Confirm")
-
-        button_layout.addWidget(self.confirm_button)
-
-        main_layout.addLayout(names_layout)
-        main_layout.addLayout(button_layout)
-
-        self.setLayout(main_layout)
-
-    def open_colordialog(self, button):
-        """ Open color dialog to get color for token
-        
-        Args:
-            button: QPushButton
-        """
-
-        color_dialog = QColorDialog()
-        if color_dialog.exec_() == QColorDialog.Accepted:
-            button.setStyleSheet(
-                "background-color: {}".format(color_dialog.selectedColor().name())
-            )
-        button.clearFocus()
-        self.player_colors.append(color_dialog.selectedColor().name())
+from lib import board_data
+from lib import Profiler
+from lib import tournament
 
 
 def main():
@@ -199,17 +22,65 @@ def main():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("-d", "--debug", default = False, action="store_true")
+    parser.add_argument(
+        "--tournament", nargs = "+", metavar = "BOT",
+        help = f"run a headless round robin between bots ({', '.join(tournament.BOTS)})"
+    )
+    parser.add_argument("--games", type = int, default = 100, help = "games per match")
+    parser.add_argument("--players", type = int, default = 2, help = "players per game")
+    parser.add_argument(
+        "--seed", type = int, default = None,
+        help = "seed of the dice, random for a game and 0 for a tournament by default"
+    )
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument(
+        "--archive", metavar = "DIR", default = None,
+        help = "save the event log of every tournament game in DIR"
+    )
+
+    parser.add_argument(
+        "--tiles", type = int, default = None,
+        help = "play a variant of the board with this many tiles, for load tests"
+    )
+    parser.add_argument(
+        "--width", type = int, default = None, help = "tiles of the bottom row of the variant"
+    )
+
+    parser.add_argument(
+        "--profile", metavar = "FILE", default = None,
+        help = "time the phases of the turns, FILE.json for a Chrome trace, "
+               "collapsed stacks for flamegraphs otherwise"
+    )
 
     args = parser.parse_args()
+    board = None
+
+    if args.tiles is not None:
+        board = board_data.load_variant(
+            os.environ.get("MONOPOLY_BOARD", "classic"), args.tiles, args.width
+        )
+
+    if args.tournament:
+        tournament.main(
+            args.tournament, args.games, args.players, args.seed or 0, args.workers,
+            args.archive, board,
+        )
+        sys.exit()
+
+    if args.profile:
+        Profiler.PROFILER.enable()
+
+    # Qt is only needed from here
+    from PyQt5.QtWidgets import QApplication
+
+    from lib.MainWindow import MainWindow
 
-    reboot_code = MainWindow.EXIT_CODE_REBOOT
+    app = QApplication(sys.argv)
 
-    # trick to get to restart the app when the game is over
-    while reboot_code == MainWindow.EXIT_CODE_REBOOT:
-        app = QApplication(sys.argv)
+    window = MainWindow(args.debug, args.seed, board)
+    window.show()
 
-        window = MainWindow(args.debug)
-        window.show()
+    app.exec_()
 
-        reboot_code = app.exec_()
-        app = None
+    if args.profile:
+        Profiler.PROFILER.dump(args.profile)
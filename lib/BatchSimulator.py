@@ -0,0 +1,590 @@
+""" Batch Monte Carlo simulator
+
+Advance thousands of games at once with NumPy arrays, same rules as the
+GameEngine: roll of 2 dice, wrap at the end of the board with the Start
+money, 3 doubles send to jail, taxes go to Free Parking, Chance and
+Community Chest cards.
+
+Every game has its own ring of each deck, shuffled again when exhausted,
+and skips the Get out of jail cards its players hold. Unlike the engine,
+a card moving to another deck tile doesn't draw again.
+
+State arrays are shaped (games, players) for the players and (games, tiles)
+for the board.
+"""
+
+import numpy as np
+
+from . import board_data
+from . import core
+from . import Dice
+from . import rent_table
+
+
+NO_OWNER = -1
+HOTEL = 5
+
+(
+    MOVE_TO, MOVE_BY, GO_TO_JAIL, PAY, COLLECT, PAY_EACH, COLLECT_EACH, JAIL_CARD,
+    MOVE_BACK_TO,
+) = range(len(board_data.CARD_ACTIONS))
+
+
+def board_tables(board = None):
+    """ Per position tables of the board from the compiled board tables
+
+    Args:
+        board (board_data.BoardTables): core.BOARD when None
+    Returns:
+        dict of str: np.ndarray of one value per tile
+    """
+
+    board = board or core.BOARD
+    rents = rent_table.for_board(board)
+    groups = np.array([-1 if group is None else group for group in board.groups])
+    is_property = groups >= 0
+    price = np.array([price or 0 for price in board.prices], dtype = np.int64)
+    house_price = np.array([
+        0 if group is None else board.group_house_prices[group] or 0 for group in board.groups
+    ], dtype = np.int64)
+    tax = np.array([
+        value if kind == "tax" else 0 for kind, value in zip(board.kinds, board.values)
+    ], dtype = np.int64)
+    same_group = is_property[:, None] & (groups[:, None] == groups[None, :])
+
+    return {
+        "is_property": is_property,
+        "price": price,
+        "mortgage": price // 2,
+        "house_price": house_price,
+        "tax": tax,
+        "same_group": same_group,
+        "rent": np.array(rents.table, dtype = np.int64).reshape(
+            board.nb_tiles, rent_table.NB_LEVELS, rents.nb_counts
+        ),
+        "dice_rent": np.array(rents.dice_rent),
+        "deck": np.array([
+            board_data.DECK_KINDS.index(kind) if kind in board_data.DECK_KINDS else -1
+            for kind in board.kinds
+        ]),
+        "card_action": np.array(
+            [board_data.CARD_ACTIONS.index(action) for action in board.card_actions],
+            dtype = np.int8
+        ),
+        "card_value": np.array(board.card_values, dtype = np.int64),
+    }
+
+
+def buildable_groups(board = None):
+    """ Board positions of the groups that can have houses
+
+    Smaller groups are padded by repeating their first tile so all the
+    groups fit in one array
+
+    Args:
+        board (board_data.BoardTables): core.BOARD when None
+    Returns:
+        np.ndarray of shape (groups, largest group)
+    """
+
+    board = board or core.BOARD
+    # in board order, the order build() goes through them
+    positions = sorted(
+        tiles for tiles, house_price in zip(board.group_tiles, board.group_house_prices)
+        if house_price is not None
+    )
+    size = max((len(tiles) for tiles in positions), default = 0)
+
+    return np.array(
+        [tiles + tiles[:1] * (size - len(tiles)) for tiles in positions], dtype = np.intp
+    ).reshape(len(positions), size)
+
+
+class BatchSimulator:
+    """ N concurrent games advanced one roll at a time
+
+    Args:
+        nb_games (int)
+        nb_players (int)
+        seed (int): seed of the dice
+        build_reserve (int): players build a house on each tile of their
+            complete groups as long as they keep this much money,
+            None to never build
+        board (board_data.BoardTables): board of every game, core.BOARD when None
+    """
+
+    def __init__(self, nb_games, nb_players, seed = None, build_reserve = None, board = None):
+        board = board or core.BOARD
+        self.nb_games = nb_games
+        self.nb_players = nb_players
+        self.build_reserve = build_reserve
+        self.dice = Dice.Dice(seed)
+
+        self.start_pos = board.start_pos
+        self.jail_pos = board.jail_pos
+        self.free_parking_pos = board.free_parking_pos
+        self.go_to_jail_pos = board.go_to_jail_pos
+
+        tables = board_tables(board)
+        self.is_property = tables["is_property"]
+        self.price = tables["price"]
+        self.rent = tables["rent"]
+        self.dice_rent = tables["dice_rent"]
+        self.same_group = tables["same_group"]
+        self.mortgage_value = tables["mortgage"]
+        self.house_price = tables["house_price"]
+        self.tax = tables["tax"]
+        self.deck = tables["deck"]
+        self.card_action = tables["card_action"]
+        self.card_value = tables["card_value"]
+        self.groups = buildable_groups(board)
+        self.group_cost = np.array([
+            self.house_price[np.unique(positions)].sum() for positions in self.groups
+        ])
+
+        self.nb_tiles = board.nb_tiles
+        self.start_money = board.salary
+
+        games_players = (nb_games, nb_players)
+        games_tiles = (nb_games, self.nb_tiles)
+
+        self.positions = np.zeros(games_players, dtype = np.int16)
+        self.balances = np.full(games_players, 1500, dtype = np.int64)
+        self.jail = np.zeros(games_players, dtype = np.int8)
+        self.alive = np.ones(games_players, dtype = bool)
+
+        self.owner = np.full(games_tiles, NO_OWNER, dtype = np.int8)
+        self.houses = np.zeros(games_tiles, dtype = np.int8)
+
+        self.current = np.zeros(nb_games, dtype = np.int8)
+        self.doubles = np.zeros(nb_games, dtype = np.int8)
+        self.free_parking = np.zeros(nb_games, dtype = np.int64)
+        self.turns = np.zeros(nb_games, dtype = np.int64)
+        self.done = np.zeros(nb_games, dtype = bool)
+        self.winner = np.full(nb_games, NO_OWNER, dtype = np.int8)
+
+        self.landings = np.zeros(self.nb_tiles, dtype = np.int64)
+
+        # card indexes of each deck in the order of each game, the shuffles
+        # have their own stream so the rolls don't depend on the cards
+        self.card_dice = self.dice.split(0)
+        self.deck_cards = [
+            np.array(board.deck_cards[kind], dtype = np.intp) for kind in board_data.DECK_KINDS
+        ]
+        self.deck_orders = [self.shuffled(cards, nb_games) for cards in self.deck_cards]
+        self.deck_positions = np.zeros((nb_games, len(self.deck_cards)), dtype = np.intp)
+        # player holding each Get out of jail card in each game
+        self.card_holder = np.full((nb_games, len(board.card_actions)), NO_OWNER, dtype = np.int8)
+
+    def shuffled(self, cards, nb_games):
+        """ The cards in a new order for each of nb_games
+
+        Returns:
+            np.ndarray of shape (nb_games, cards)
+        """
+
+        return cards[self.card_dice.array_permutations(nb_games, cards.size)]
+
+    def roll(self, size):
+        """ Roll 2 dice for size games in one call
+
+        Returns:
+            die1, die2, sum_dice (np.ndarray)
+        """
+
+        dice = self.dice.array_rolls(size)
+        return dice[0], dice[1], dice[0] + dice[1]
+
+    def step(self):
+        """ One roll of the current player in every running game
+
+        Returns:
+            int: number of games still running
+        """
+
+        running_games = np.flatnonzero(~self.done)
+
+        if running_games.size == 0:
+            return 0
+
+        games = running_games
+
+        players = self.current[games].astype(np.intp)
+        die1, die2, sum_dice = self.roll(games.size)
+        double = die1 == die2
+        self.turns[games] += 1
+
+        jailed = self.jail[games, players] > 0
+
+        # a Get out of jail card frees the player, who plays the roll normally
+        held = self.card_holder[games] == players[:, None]
+        carded = jailed & held.any(axis = 1)
+        self.jail[games[carded], players[carded]] = 0
+        self.card_holder[games[carded], held[carded].argmax(axis = 1)] = NO_OWNER
+        jailed &= ~carded
+        pass_turn = jailed.copy()
+
+        # in jail: out with a double, else one turn less
+        jail_games, jail_players = games[jailed], players[jailed]
+        self.jail[jail_games, jail_players] = np.where(
+            double[jailed], 0, self.jail[jail_games, jail_players] - 1
+        )
+
+        free = ~jailed
+        games, players = games[free], players[free]
+        sum_dice, double = sum_dice[free], double[free]
+
+        new_pos = self.positions[games, players] + sum_dice
+        passed_start = new_pos >= self.nb_tiles
+        new_pos = (new_pos % self.nb_tiles).astype(np.intp)
+        self.landings += np.bincount(new_pos, minlength = self.nb_tiles)
+
+        # Start money when passing, twice the amount when landing on it
+        salary = (
+            passed_start
+            & (new_pos != self.start_pos)
+            & (new_pos != self.go_to_jail_pos)
+        ) * self.start_money
+
+        cards = self.draw_cards(games, self.deck[new_pos])
+        card_due = np.zeros(games.size, dtype = np.int64)
+        card_jail = np.zeros(games.size, dtype = bool)
+        transfers = np.zeros(0, dtype = np.intp)
+
+        if (cards >= 0).any():
+            new_pos, card_salary, card_due, card_jail, transfers = self.apply_cards(
+                games, players, new_pos, cards
+            )
+            salary += card_salary
+
+        salary += (new_pos == self.start_pos) * 2 * self.start_money
+        self.positions[games, players] = new_pos
+        self.balances[games, players] += salary
+
+        owner = self.owner[games, new_pos]
+        on_property = self.is_property[new_pos]
+
+        # buy everything affordable, like the default engine decision
+        buy = (
+            on_property
+            & (owner == NO_OWNER)
+            & (self.balances[games, players] >= self.price[new_pos])
+        )
+        self.owner[games[buy], new_pos[buy]] = players[buy]
+        self.balances[games[buy], players[buy]] -= self.price[new_pos[buy]]
+
+        pays_rent = on_property & (owner != NO_OWNER) & (owner != players)
+        rent = self.get_rent(games, new_pos, owner, sum_dice, pays_rent)
+        tax = self.tax[new_pos] + card_due
+        due = rent + tax
+
+        can_pay = self.balances[games, players] >= due
+        self.balances[games[can_pay], players[can_pay]] -= due[can_pay]
+
+        paid_rent = can_pay & pays_rent
+        self.balances[games[paid_rent], owner[paid_rent]] += rent[paid_rent]
+        self.free_parking[games[can_pay]] += tax[can_pay]
+
+        # few players can't pay cash, settle them one by one
+        for row in np.flatnonzero(~can_pay):
+            if self.settle_debt(games[row], players[row], due[row]):
+                if pays_rent[row]:
+                    self.balances[games[row], owner[row]] += rent[row]
+                else:
+                    self.free_parking[games[row]] += tax[row]
+
+        if transfers.size:
+            self.transfer_all(games[transfers], players[transfers], cards[transfers])
+
+        on_free_parking = new_pos == self.free_parking_pos
+        parking_games = games[on_free_parking]
+        self.balances[parking_games, players[on_free_parking]] += self.free_parking[parking_games]
+        self.free_parking[parking_games] = 0
+
+        alive = self.alive[games, players]
+        self.doubles[games] = np.where(double, self.doubles[games] + 1, 0)
+
+        to_jail = alive & (
+            (new_pos == self.go_to_jail_pos) | (self.doubles[games] == 3) | card_jail
+        )
+        self.positions[games[to_jail], players[to_jail]] = self.jail_pos
+        self.jail[games[to_jail], players[to_jail]] = 3
+
+        if self.build_reserve is not None:
+            self.build(games[alive], players[alive])
+
+        pass_turn[free] = ~alive | to_jail | ~double
+        self.pass_player_turn(running_games[pass_turn])
+        self.check_game_over()
+
+        return int((~self.done).sum())
+
+    def draw_cards(self, games, decks):
+        """ Next card of a deck for each game, the rings exhausted are
+        shuffled again and the cards held by a player are skipped, like
+        Deck.draw
+
+        Args:
+            decks (np.ndarray): deck to draw from per game, -1 for none
+        Returns:
+            np.ndarray of card indexes, -1 where nothing was drawn
+        """
+
+        cards = np.full(games.size, -1, dtype = np.intp)
+
+        for deck, order in enumerate(self.deck_orders):
+            rows = np.flatnonzero(decks == deck)
+            size = order.shape[1]
+
+            # the rows that drew a held card draw again, a deck of held
+            # cards only gives nothing
+            for attempt in range(size):
+                if rows.size == 0:
+                    break
+
+                deck_games = games[rows]
+                position = self.deck_positions[deck_games, deck]
+                drawn = order[deck_games, position]
+                position += 1
+
+                exhausted = position == size
+
+                if exhausted.any():
+                    order[deck_games[exhausted]] = self.shuffled(
+                        self.deck_cards[deck], int(exhausted.sum())
+                    )
+                    position[exhausted] = 0
+
+                self.deck_positions[deck_games, deck] = position
+
+                free = self.card_holder[deck_games, drawn] == NO_OWNER
+                cards[rows[free]] = drawn[free]
+                rows = rows[~free]
+
+        return cards
+
+    def apply_cards(self, games, players, positions, cards):
+        """ Effects of the cards drawn, -1 for the rows without card
+
+        Moves count as landings, incomes and Get out of jail cards are
+        given here. Payments are owed to Free Parking like taxes, the
+        payments between players are left to transfer_all
+
+        Returns:
+            positions (np.ndarray): after the moves
+            salary (np.ndarray): Start money of the moves passing Start
+            due (np.ndarray): money owed to Free Parking
+            to_jail (np.ndarray of bool)
+            transfers (np.ndarray): rows paying or collecting from each player
+        """
+
+        drawn = cards >= 0
+        action = np.full(games.size, -1, dtype = np.int8)
+        action[drawn] = self.card_action[cards[drawn]]
+        value = np.zeros(games.size, dtype = np.int64)
+        value[drawn] = self.card_value[cards[drawn]]
+
+        move_to = action == MOVE_TO
+        move_back_to = action == MOVE_BACK_TO
+        move_by = action == MOVE_BY
+        stepped = positions + value
+        new_pos = positions.copy()
+        new_pos[move_to | move_back_to] = value[move_to | move_back_to]
+        new_pos[move_by] = stepped[move_by] % self.nb_tiles
+        self.landings += np.bincount(
+            new_pos[move_to | move_back_to | move_by], minlength = self.nb_tiles
+        )
+
+        # going back never passes Start
+        passed_start = (move_to & (new_pos < positions)) | (move_by & (stepped >= self.nb_tiles))
+        salary = (
+            passed_start
+            & (new_pos != self.start_pos)
+            & (new_pos != self.go_to_jail_pos)
+        ) * self.start_money
+
+        collect = action == COLLECT
+        self.balances[games[collect], players[collect]] += value[collect]
+
+        jail_card = action == JAIL_CARD
+        self.card_holder[games[jail_card], cards[jail_card]] = players[jail_card]
+
+        due = np.where(action == PAY, value, 0)
+        transfers = np.flatnonzero((action == PAY_EACH) | (action == COLLECT_EACH))
+
+        return new_pos, salary, due, action == GO_TO_JAIL, transfers
+
+    def transfer_all(self, games, players, cards):
+        """ Pay each other player or collect from each, one game per row
+
+        The rows where every payer has the cash are settled at once, the
+        others one by one with transfer
+        """
+
+        rows = np.arange(games.size)
+        amount = self.card_value[cards]
+        pays = self.card_action[cards] == PAY_EACH
+
+        alive = self.alive[games]
+        others = alive.copy()
+        others[rows, players] = False
+        nb_others = others.sum(axis = 1)
+        balances = self.balances[games]
+
+        payer_can_pay = balances[rows, players] >= amount * nb_others
+        others_can_pay = ((balances >= amount[:, None]) | ~others).all(axis = 1)
+        playing = alive[rows, players]
+        fast = playing & np.where(pays, payer_can_pay, others_can_pay)
+
+        # what the player gets, each other player gets the opposite
+        gain = np.where(pays, -amount, amount)
+        delta = np.where(others, -gain[:, None], 0)
+        delta[rows, players] = gain * nb_others
+        self.balances[games[fast]] += delta[fast]
+
+        for row in np.flatnonzero(playing & ~fast):
+            self.transfer(games[row], players[row], cards[row])
+
+    def transfer(self, game, player, card):
+        """ Pay each other player or collect from each, one by one """
+
+        if not self.alive[game, player]:
+            return
+
+        amount = self.card_value[card]
+        others = np.flatnonzero(self.alive[game])
+
+        for other in others[others != player]:
+            if self.card_action[card] == PAY_EACH:
+                if not self.settle_debt(game, player, amount):
+                    break
+
+                self.balances[game, other] += amount
+
+            elif self.settle_debt(game, other, amount):
+                self.balances[game, player] += amount
+
+    def get_rent(self, games, positions, owner, sum_dice, pays_rent):
+        """ Rent table lookup for the rows paying rent, 0 for the others """
+
+        rent = np.zeros(games.size, dtype = np.int64)
+        rows = np.flatnonzero(pays_rent)
+
+        if rows.size == 0:
+            return rent
+
+        games, positions, owner = games[rows], positions[rows], owner[rows]
+        nb_owned = (
+            (self.owner[games] == owner[:, None]) & self.same_group[positions]
+        ).sum(axis = 1)
+
+        rent[rows] = self.rent[positions, self.houses[games, positions], nb_owned]
+        rent[rows] *= np.where(self.dice_rent[positions], sum_dice[rows], 1)
+
+        return rent
+
+    def settle_debt(self, game, player, amount):
+        """ Mortgage cheapest properties first, eliminate if not enough
+
+        Returns:
+            bool: True if the amount was paid
+        """
+
+        owned = np.flatnonzero(self.owner[game] == player)
+        real_estate = self.mortgage_value[owned].sum()
+
+        if self.balances[game, player] + real_estate < amount:
+            self.player_lost(game, player)
+            return False
+
+        for board_pos in owned[np.argsort(self.mortgage_value[owned], kind = "stable")]:
+            if self.balances[game, player] >= amount:
+                break
+
+            self.owner[game, board_pos] = NO_OWNER
+            self.houses[game, board_pos] = 0
+            self.balances[game, player] += self.mortgage_value[board_pos]
+
+        self.balances[game, player] -= amount
+        return True
+
+    def player_lost(self, game, player):
+        """ Remove the player, properties go back to the bank """
+
+        owned = self.owner[game] == player
+        self.owner[game, owned] = NO_OWNER
+        self.houses[game, owned] = 0
+        self.alive[game, player] = False
+        self.card_holder[game, self.card_holder[game] == player] = NO_OWNER
+
+    def build(self, games, players):
+        """ One more house on every tile of the players' complete groups
+
+        Groups are built in board order while the player keeps build_reserve
+        """
+
+        if self.groups.size == 0:
+            return
+
+        # reductions over the small last axis are slow, go column by column
+        owner = self.owner[games][:, self.groups]
+        houses = self.houses[games][:, self.groups]
+        candidates = owner[:, :, 0] == players[:, None]
+        not_full = houses[:, :, 0] < HOTEL
+
+        for column in range(1, self.groups.shape[1]):
+            candidates &= owner[:, :, column] == players[:, None]
+            not_full |= houses[:, :, column] < HOTEL
+
+        candidates &= not_full
+
+        if not candidates.any():
+            return
+
+        cost = np.cumsum(candidates * self.group_cost, axis = 1)
+        build = candidates & (
+            self.balances[games, players][:, None] - cost >= self.build_reserve
+        )
+        rows, groups = np.nonzero(build)
+
+        self.balances[games, players] -= (build * self.group_cost).sum(axis = 1)
+        built = (games[rows, None], self.groups[groups])
+        self.houses[built] = np.minimum(self.houses[built] + 1, HOTEL)
+
+    def pass_player_turn(self, games):
+        """ Give the turn to the next player still alive """
+
+        self.doubles[games] = 0
+        seats = np.arange(1, self.nb_players + 1)
+        candidates = (self.current[games, None] + seats) % self.nb_players
+        next_alive = self.alive[games[:, None], candidates].argmax(axis = 1)
+        self.current[games] = candidates[np.arange(games.size), next_alive]
+
+    def check_game_over(self):
+        over = ~self.done & (self.alive.sum(axis = 1) <= 1)
+        self.winner[over] = self.alive[over].argmax(axis = 1)
+        self.done |= over
+
+    def run(self, max_turns = 10000):
+        """ Play every game until there's a winner or max_turns rolls
+
+        Returns:
+            int: number of games still running
+        """
+
+        running = int((~self.done).sum())
+
+        for i in range(max_turns):
+            running = self.step()
+
+            if running == 0:
+                break
+
+        return running
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,54 @@
-import sys
-
 from PyQt5.QtWidgets import (
     QGraphicsGridLayout,
+    QGraphicsPixmapItem,
     QGraphicsWidget,
 )
+from PyQt5.QtCore import Qt, QEasingCurve, QPointF, QPropertyAnimation, QRectF
+from PyQt5.QtGui import QPainter, QPixmap
+
+from . import core
+from . import Tile
+from . import Token
+
+
+def static_sides(width, height):
+    """ Board positions of the bottom, left, top and right rows, one
+    static pixmap each, the corners go with the bottom and top rows
+
+    Args:
+        width (int): steps from Start to the bottom left corner
+        height (int): steps from the bottom left to the top left corner
+    Returns:
+        list of range
+    """
 
-import core
-import Player
-import Tile
-import Token
+    return [
+        range(0, width + 1),
+        range(width + 1, width + height),
+        range(width + height, 2 * width + height + 1),
+        range(2 * width + height + 1, 2 * (width + height)),
+    ]
 
 
 class Board(QGraphicsWidget):
-    """ Board object on which the tiles will be """
+    """ Board object on which the tiles will be
 
-    def __init__(self, players):
+    Args:
+        players (dict of Player: color)
+        board (board_data.BoardTables): core.BOARD when None
+    """
+
+    def __init__(self, players, board = None):
         super().__init__()
-        self.free_parking = 0
+        self.board = board or core.BOARD
         self.total_tokens = []
+        self.static_layers = []
+        self.static_size = None
+
+        # indexes so lookups don't go through the layout
+        self.name2tile = {}
+        self.pos2tile = [None] * self.board.nb_tiles
+        self.player2pos = {player: self.board.start_pos for player in players}
 
         for player, color in players.items():
             self.total_tokens.append(Token.Token(player, color))
@@ -25,107 +56,139 @@ class Board(QGraphicsWidget):
         self.board_layout = QGraphicsGridLayout()
         self.board_layout.setSpacing(0)
 
-        self.properties = [
-            "Free Parking", "Strand", "Chance", "Fleet Street", "Trafalgar Square",
-            "Fenchurch Street station", "Leicester Square", "Coventry Street", "Water Works", "Piccadilly", "Go to Jail",
-            "Vine Street", "", "", "", "", "", "", "", "", "", "Regent Street",
-            "Marlborough Street", "", "", "", "", "", "", "", "", "", "Oxford Street",
-            "Community Chest", "", "", "", "", "", "", "", "", "", "Community Chest",
-            "Bow Street", "", "", "", "", "", "", "", "", "", "Bond Street",
-            "Marylebine station", "", "", "", "", "", "", "", "", "", "Liverpool Street station",
-            "Northumberland Avenue", "", "", "", "", "", "", "", "", "", "Chance",
-            "Whitehall", "", "", "", "", "", "", "", "", "", "Park Lane",
-            "Electric Company", "", "", "", "", "", "", "", "", "", "Super Tax",
-            "Pall Mall", "", "", "", "", "", "", "", "", "", "Mayfair",
-            "Visit Jail", "Pentonville Road", "Euston Road", "Chance", "The Angel Islington", "King's Cross station",
-            "Income Tax", "Whitechapel Road", "Community Chest", "Old Kent Road", "Start"
-        ]
-
-        self.board_positions = {
-            0: 20, 1: 21, 2: 22, 3: 23, 4: 24,
-            5: 25, 6: 26, 7: 27, 8: 28, 9: 29,
-            10: 30, 11: 19, 21: 31, 22: 18, 32: 32,
-            33: 17, 43: 33, 44: 16, 54: 34, 55: 15,
-            65: 35, 66: 14, 76: 36, 77: 13, 87: 37,
-            88: 12, 98: 38, 99: 11, 109: 39, 110: 10,
-            111: 9, 112: 8, 113: 7, 114: 6, 115: 5,
-            116: 4, 117: 3, 118: 2, 119: 1, 120: 0
-        }
+        board = self.board
 
-        self.house2multiplier = {
-            1: 5,
-            2: 15,
-            3: 45,
-            4: 80,
-        }
+        # row by row, the tiles added last are drawn over the others
+        for board_pos in sorted(range(board.nb_tiles), key = lambda x: board.grid[x]):
+            # Give all the data necessary to the tile from the board tables
+            group_index = board.groups[board_pos]
 
-        self.hotel_multiplier = 125
-
-        positions = [(i, j) for i in range(11) for j in range(11)]
-
-        for position, name in zip(positions, self.properties):
-            if name == "":
-                continue
-            
-            # Give all the data necessary to the tile from the core code
-            fake_pos = core.grid2pos(position)
-            board_pos = self.board_positions[fake_pos]
-            
-            if board_pos in core.PROPERTIES:
-                price = core.PROPERTIES[board_pos][name]["Price"]
-                rent = core.PROPERTIES[board_pos][name]["Rent"]
+            if group_index is not None:
+                price = board.prices[board_pos]
+                rent = board.rents[board_pos]
                 mortgage = price / 2
-                color_property = core.PROPERTIES[board_pos][name]["Color"]
-                group = core.COLOR2GROUP_INFO[color_property]["Name"]
-                number = core.COLOR2GROUP_INFO[color_property]["Number"]
-                house_price = core.COLOR2GROUP_INFO[color_property]["House price"]
+                color_property = board.colors[board_pos]
+                group = board.group_names[group_index]
+                number = board.group_sizes[group_index]
+                house_price = board.group_house_prices[group_index]
 
-            elif board_pos in core.SPECIAL_CASES:
-                price = core.SPECIAL_CASES[board_pos][name]
+            else:
+                price = board.values[board_pos]
                 rent, mortgage = None, None
                 house_price = None
                 color_property, group, number = None, None, None
 
-            elif board_pos in core.CHANCES or board_pos in core.COMMUNITY_CHESTS:
-                price, rent, mortgage = None, None, None
-                house_price = None
-                color_property, group, number = None, None, None
-
-            self.board_layout.addItem(
-                Tile.Tile(
-                    name,
-                    board_pos,
-                    price, rent, mortgage,
-                    players,
-                    color_property,
-                    group,
-                    number,
-                    house_price,
-                    parent=self
-                    ),
-                *position
+            name = board.names[board_pos]
+            tile = Tile.Tile(
+                name,
+                board.kinds[board_pos],
+                board_pos,
+                price, rent, mortgage,
+                players,
+                color_property,
+                group,
+                number,
+                house_price,
+                parent=self
             )
 
+            self.name2tile.setdefault(name, tile)
+            self.pos2tile[board_pos] = tile
+            self.board_layout.addItem(tile, *board.grid[board_pos])
+
         self.setLayout(self.board_layout)
 
+        # the static layer has the size of the board, redraw it if that changes
+        self.geometryChanged.connect(self.check_static_layer)
+
+        # tokens are created on Start, kept here to put them back after a load
+        self.player2token = {
+            token.get_player(): token
+            for token in self.pos2tile[self.board.start_pos].get_all_tokens()
+        }
+
+    def render_static_layer(self):
+        """ Draw the tiles once in pixmaps under them
+
+        Names, prices, borders and colors never change: they are rendered
+        without the tokens, houses and owner markers, then the tiles stop
+        drawing them. Repaints only go through the pixmaps and the few
+        dynamic items left. There is one pixmap per side of the board so
+        the empty middle isn't drawn. The board must be in a scene.
+        """
+
+        if self.scene() is None:
+            return
+
+        tiles = [tile for tile in self.pos2tile if tile is not None]
+
+        for tile in tiles:
+            tile.set_static_cached(False)
+
+        self.adjustSize()
+        self.board_layout.activate()
+        self.static_size = self.size()
+
+        dynamic_items = [
+            item for tile in tiles for item in tile.get_dynamic_items() if item.isVisible()
+        ]
+
+        for item in dynamic_items:
+            item.hide()
+
+        for layer in self.static_layers:
+            layer.hide()
+
+        pixmaps = []
+
+        for side in static_sides(self.board.width, self.board.height):
+            # texts can overflow their tile and borders are drawn half outside,
+            # whole pixels so the pixmap isn't scaled
+            rect = QRectF()
+
+            for board_pos in side:
+                tile = self.pos2tile[board_pos]
+                tile_rect = tile.boundingRect().united(tile.childrenBoundingRect())
+                rect = rect.united(tile.mapRectToParent(tile_rect))
+
+            rect = rect.adjusted(-1, -1, 1, 1).toAlignedRect()
+            pixmap = QPixmap(rect.size())
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            self.scene().render(painter, QRectF(pixmap.rect()), self.mapRectToScene(QRectF(rect)))
+            painter.end()
+            pixmaps.append((rect, pixmap))
+
+        for item in dynamic_items:
+            item.show()
+
+        while len(self.static_layers) < len(pixmaps):
+            layer = QGraphicsPixmapItem(self)
+            layer.setZValue(-1)
+            self.static_layers.append(layer)
+
+        for layer, (rect, pixmap) in zip(self.static_layers, pixmaps):
+            layer.setPixmap(pixmap)
+            layer.setPos(QPointF(rect.topLeft()))
+            layer.show()
+
+        for tile in tiles:
+            tile.set_static_cached(True)
+
+    def check_static_layer(self):
+        if self.static_layers and self.static_size != self.size():
+            self.render_static_layer()
+
     def get_player_tile(self, current_player):
         """ Return tile on which the current player is on 
         
         Args: current_player (Player)
         """
 
-        # Loop through the tiles
-        for i in range(0, 40):
-            tile = self.board_layout.itemAt(i)
-
-            if tile.has_tokens():
-                tokens = tile.get_all_tokens()
+        board_pos = self.player2pos.get(current_player)
 
-                for token in tokens:
-                    player = token.get_player()
-
-                    if player == current_player:
-                        return tile
+        if board_pos is not None:
+            return self.pos2tile[board_pos]
 
     def get_tile(self, tile_name = None, tile_pos = None):
         """ Get tile object from name or pos 
@@ -136,15 +199,96 @@ class Board(QGraphicsWidget):
         Returns:
             tile (Tile)
         """
-        
-        for i in range(0, 40):
-            tile = self.board_layout.itemAt(i)
-            
-            if tile_name == tile.get_name():
-                return tile
-
-            if tile_pos == tile.get_board_pos():
-                return tile
+
+        if tile_name is not None:
+            return self.name2tile.get(tile_name)
+
+        return self.pos2tile[tile_pos]
+
+    def move_token(self, player, new_tile):
+        """ Move the token of player from its tile to new_tile
+
+        Args:
+            player (Player)
+            new_tile (Tile)
+        """
+
+        current_tile = self.get_player_tile(player)
+
+        # add/remove token from new/current tile
+        token = current_tile.get_token(player)
+        current_tile.remove_token(token)
+        new_tile.add_token(token)
+
+        # remove token from layout
+        current_tile.remove_token_layout(token)
+
+        # add token in layout
+        new_tile.display_game_pieces()
+
+        # change token's tile
+        token.set_tile(new_tile)
+        self.player2pos[player] = new_tile.get_board_pos()
+
+    def slide_token(self, player, new_tile):
+        """ Move the token of player to new_tile from where it was drawn
+
+        Returns:
+            QPropertyAnimation of the token position, not started
+        """
+
+        token = self.get_player_tile(player).get_token(player)
+        start = token.scenePos()
+
+        self.move_token(player, new_tile)
+        new_tile.layout.activate()
+        end = token.pos()
+
+        # above the other tiles while it crosses them
+        new_tile.setZValue(1)
+        token.setPos(new_tile.mapFromScene(start))
+
+        animation = QPropertyAnimation(token, b"pos")
+        animation.setStartValue(token.pos())
+        animation.setEndValue(end)
+        animation.setEasingCurve(QEasingCurve.InOutQuad)
+
+        def lower_tile(state):
+            if state == QPropertyAnimation.Stopped:
+                new_tile.setZValue(0)
+
+        animation.stateChanged.connect(lower_tile)
+
+        return animation
+
+    def remove_token(self, player):
+        """ Take the token of player off the board """
+
+        tile = self.get_player_tile(player)
+        token = tile.get_token(player)
+        tile.remove_token(token)
+        tile.remove_token_layout(token)
+        token.hide()
+        del self.player2pos[player]
+
+    def place_token(self, player, new_tile):
+        """ Put the token of player on new_tile, even if it was removed
+
+        Args:
+            player (Player)
+            new_tile (Tile)
+        """
+
+        if player in self.player2pos:
+            self.move_token(player, new_tile)
+            return
+
+        token = self.player2token[player]
+        new_tile.add_token(token)
+        new_tile.display_game_pieces()
+        token.set_tile(new_tile)
+        token.show()
+        self.player2pos[player] = new_tile.get_board_pos()
 
 
 def main():
@@ -0,0 +1,138 @@
+""" Decks of Chance and Community Chest cards
+
+The cards are defined with the board (see board_data), a deck only keeps
+their indexes in the card tables. A deck is shuffled once into a ring
+buffer and drawn by moving a cursor, it is shuffled again when every card
+was drawn. A Get out of jail card stays with the player who drew it until
+used, the draws skip it meanwhile.
+"""
+
+from array import array
+import struct
+
+
+DECK = struct.Struct("<QHHB")
+HELD = struct.Struct("<hB")
+
+
+class Deck:
+    """ Ring buffer of the cards of one deck
+
+    Args:
+        cards (list of int): indexes of the cards in the board tables
+        dice (Dice.Dice): stream of the shuffles of this deck
+    """
+
+    __slots__ = ("cards", "dice", "order", "position", "held")
+
+    def __init__(self, cards, dice):
+        self.cards = list(cards)
+        self.dice = dice
+        # card: player holding it
+        self.held = {}
+        self.shuffle()
+
+    def shuffle(self):
+        self.order = array("h", [self.cards[i] for i in self.dice.permutation(len(self.cards))])
+        self.position = 0
+
+    def draw(self):
+        """ Next card, shuffling again when the deck is exhausted
+
+        Returns:
+            card (int), None when the deck has no card to draw
+        """
+
+        for i in range(len(self.order)):
+            if self.position == len(self.order):
+                self.shuffle()
+
+            card = self.order[self.position]
+            self.position += 1
+
+            if card not in self.held:
+                return card
+
+        return None
+
+    def hold(self, card, player):
+        """ The player keeps the card until release """
+        self.held[card] = player
+
+    def release(self, player):
+        """ Give back a card held by the player
+
+        Returns:
+            card (int), None when the player holds no card of this deck
+        """
+
+        for card, holder in self.held.items():
+            if holder is player:
+                del self.held[card]
+                return card
+
+        return None
+
+    def holds(self, player):
+        return any(holder is player for holder in self.held.values())
+
+    def copy(self, old2new):
+        """ Same deck at the same card, drawing from the copy doesn't move
+        the original
+
+        Args:
+            old2new (dict of Player: Player): holders of the copy
+        """
+
+        deck = Deck.__new__(Deck)
+        deck.cards = self.cards
+        deck.dice = self.dice.copy()
+        deck.order = self.order[:]
+        deck.position = self.position
+        deck.held = {card: old2new[player] for card, player in self.held.items()}
+
+        return deck
+
+    def to_bytes(self, seats):
+        """ Shuffle counter, cursor, order and holders by seat """
+
+        header = DECK.pack(self.dice.get_counter(), self.position, len(self.order), len(self.held))
+        held = b"".join(HELD.pack(card, seats[player]) for card, player in self.held.items())
+
+        return header + self.order.tobytes() + held
+
+    def load_bytes(self, data, offset, players):
+        """ Put the deck back in the state written by to_bytes
+
+        Args:
+            data (bytes)
+            offset (int): start of the deck in data
+            players (list of Player): players by seat
+        Returns:
+            offset (int) after the deck
+        """
+
+        counter, position, nb_cards, nb_held = DECK.unpack_from(data, offset)
+        offset += DECK.size
+
+        self.dice.set_counter(counter)
+        self.order = array("h")
+        self.order.frombytes(data[offset:offset + 2 * nb_cards])
+        self.position = position
+        offset += 2 * nb_cards
+
+        self.held = {}
+
+        for i in range(nb_held):
+            card, seat = HELD.unpack_from(data, offset)
+            self.held[card] = players[seat]
+            offset += HELD.size
+
+        return offset
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
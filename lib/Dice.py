@@ -0,0 +1,240 @@
+""" Counter based dice
+
+The n-th roll of a stream is a pure function of the stream key and n:
+splitmix64(key + n * GOLDEN) gives 64 random bits, the high and low 32
+bits make the two dice. Nothing depends on how many rolls were drawn
+before, so a stream can be split into independent children (one per
+game or worker), skipped ahead, or generated in blocks. The same values
+shuffle the decks of cards.
+
+The rolls of the engine are computed in pure Python, about a
+microsecond each. The array methods give the same values with numpy for
+the batched simulations, numpy is only imported by them: it would be
+most of the start time of a game.
+"""
+
+from array import array
+import os
+
+from . import Profiler
+
+
+MASK = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+BLOCK_SIZE = 256
+
+np = None
+numpy_checked = False
+
+
+def load_numpy():
+    """ numpy, imported on the first call
+
+    Returns:
+        the numpy module, None when it isn't installed
+    """
+
+    global np, numpy_checked
+
+    if not numpy_checked:
+        numpy_checked = True
+
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+    return np
+
+
+def mix64(z):
+    """ splitmix64 finalizer """
+
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+    return z ^ (z >> 31)
+
+
+class Dice:
+    """ Stream of rolls of 2 dice
+
+    Args:
+        seed (int): random seed when None
+        key (int): raw key of the stream, used by split
+    """
+
+    __slots__ = ["key", "counter", "block_start", "buffer"]
+
+    def __init__(self, seed = None, key = None):
+        if key is None:
+            if seed is None:
+                seed = int.from_bytes(os.urandom(8), "little")
+
+            key = mix64(seed & MASK)
+
+        self.key = key
+        self.counter = 0
+        self.block_start = 0
+        self.buffer = array("B")
+
+    def split(self, stream):
+        """ Independent child stream
+
+        Args:
+            stream (int): index of the child, the same index gives the same stream
+        Returns:
+            Dice
+        """
+
+        return Dice(key = mix64(self.key ^ mix64((stream + 1) * GOLDEN & MASK)))
+
+    def copy(self):
+        """ Same stream at the same roll, drawing from the copy doesn't
+        move the original
+        """
+
+        dice = Dice(key = self.key)
+        dice.counter = self.counter
+        dice.block_start = self.block_start
+        dice.buffer = self.buffer
+
+        return dice
+
+    def get_counter(self):
+        return self.counter
+
+    def set_counter(self, counter):
+        """ Next roll will be the roll number counter of the stream """
+        self.counter = counter
+
+    def block(self, start, nb_rolls):
+        """ Rolls start to start + nb_rolls of the stream
+
+        Returns:
+            array of 2 * nb_rolls dice values, die1 and die2 alternated
+        """
+
+        dice = array("B", bytes(2 * nb_rolls))
+        z = self.key + (start + 1) * GOLDEN
+
+        for i in range(0, 2 * nb_rolls, 2):
+            x = z & MASK
+            x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+            x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK
+            x ^= x >> 31
+            dice[i] = ((x >> 32) * 6 >> 32) + 1
+            dice[i + 1] = ((x & 0xFFFFFFFF) * 6 >> 32) + 1
+            z += GOLDEN
+
+        return dice
+
+    def rolls(self, nb_rolls):
+        """ Next nb_rolls rolls in one block, see block """
+
+        dice = self.block(self.counter, nb_rolls)
+        self.counter += nb_rolls
+
+        return dice
+
+    def array_bits(self, start, nb_values):
+        """ 64 random bits of the values start to start + nb_values
+
+        Returns:
+            np.ndarray of nb_values np.uint64
+        """
+
+        load_numpy()
+        counters = np.arange(start + 1, start + nb_values + 1, dtype = np.uint64)
+
+        with np.errstate(over = "ignore"):
+            x = np.uint64(self.key) + counters * np.uint64(GOLDEN)
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x ^= x >> np.uint64(31)
+
+        return x
+
+    def array_block(self, start, nb_rolls):
+        """ Same as block as a numpy array
+
+        Returns:
+            np.ndarray of shape (2, nb_rolls), die1 and die2
+        """
+
+        x = self.array_bits(start, nb_rolls)
+        dice = np.empty((2, nb_rolls), dtype = np.int16)
+        dice[0] = ((x >> np.uint64(32)) * np.uint64(6) >> np.uint64(32)) + 1
+        dice[1] = ((x & np.uint64(0xFFFFFFFF)) * np.uint64(6) >> np.uint64(32)) + 1
+
+        return dice
+
+    def array_rolls(self, nb_rolls):
+        """ Next nb_rolls rolls as a numpy array, see array_block """
+
+        dice = self.array_block(self.counter, nb_rolls)
+        self.counter += nb_rolls
+
+        return dice
+
+    def permutation(self, size):
+        """ Random order of range(size), a Fisher-Yates shuffle drawing the
+        next size values of the stream
+
+        Returns:
+            list of int
+        """
+
+        order = list(range(size))
+        z = self.key + (self.counter + 1) * GOLDEN
+
+        for i in range(size - 1, 0, -1):
+            j = mix64(z & MASK) * (i + 1) >> 64
+            order[i], order[j] = order[j], order[i]
+            z += GOLDEN
+
+        self.counter += size
+
+        return order
+
+    def array_permutations(self, nb_orders, size):
+        """ nb_orders random orders of range(size) at once, sorting the
+        next nb_orders * size values of the stream
+
+        Returns:
+            np.ndarray of shape (nb_orders, size)
+        """
+
+        bits = self.array_bits(self.counter, nb_orders * size).reshape(nb_orders, size)
+        self.counter += nb_orders * size
+
+        return np.argsort(bits, axis = 1)
+
+    def roll(self):
+        """ Next roll, taken from a precomputed block
+
+        Returns:
+            die1, die2, sum_dice
+        """
+
+        index = 2 * (self.counter - self.block_start)
+
+        if not 0 <= index < len(self.buffer):
+            self.block_start = self.counter
+            self.buffer = self.block(self.counter, BLOCK_SIZE)
+            index = 0
+
+        self.counter += 1
+        die1 = self.buffer[index]
+        die2 = self.buffer[index + 1]
+
+        return die1, die2, die1 + die2
+
+
+Profiler.register(Dice, ["roll"])
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+""" Append only log of the game events
+
+Every event of the GameEngine is packed in a fixed size binary record:
+    kind (B), seat (B), a (H), b (H), amount (i)
+a and b depend on the kind (positions, dice, owner seat...). A trade is a
+trade record with the cash followed by a trade_tile record per property
+changing hands. A card drawn is a card record followed by the records of
+its effects. A log can be saved and replayed at full speed into a
+GameState without any rendering.
+"""
+
+from array import array
+import struct
+
+from . import board_data
+from . import core
+from . import GameState
+
+
+MAGIC = b"MNPL"
+VERSION = 1
+HEADER = struct.Struct("<4sBB")
+RECORD = struct.Struct("<BBHHi")
+ARCHIVE_LENGTH = struct.Struct("<I")
+
+KINDS = [
+    "order", "roll", "move", "jail", "jail_wait", "jail_release", "salary",
+    "purchase", "cannot_afford", "rent", "tax", "free_parking", "mortgage",
+    "build", "elimination", "game_over", "turn", "trade", "trade_tile",
+    "card", "card_payment", "card_income", "card_transfer", "jail_card",
+]
+KIND2CODE = {kind: code for code, kind in enumerate(KINDS)}
+
+(
+    ORDER, ROLL, MOVE, JAIL, JAIL_WAIT, JAIL_RELEASE, SALARY,
+    PURCHASE, CANNOT_AFFORD, RENT, TAX, FREE_PARKING, MORTGAGE,
+    BUILD, ELIMINATION, GAME_OVER, TURN, TRADE, TRADE_TILE,
+    CARD, CARD_PAYMENT, CARD_INCOME, CARD_TRANSFER, JAIL_CARD,
+) = range(len(KINDS))
+DECK2CODE = {kind: code for code, kind in enumerate(board_data.DECK_KINDS)}
+
+
+class EventLog:
+    """ Binary log of a game
+
+    Args:
+        player_names (list of str): names by seat
+    """
+
+    def __init__(self, player_names):
+        self.player_names = list(player_names)
+        self.buffer = bytearray()
+
+    def __len__(self):
+        return len(self.buffer) // RECORD.size
+
+    def append(self, kind, seat, a = 0, b = 0, amount = 0):
+        self.buffer += RECORD.pack(kind, seat, a, b, int(amount))
+
+    def encode(self, event, seats):
+        """ Append a GameEngine.Event
+
+        Args:
+            event (GameEngine.Event)
+            seats (dict of Player: int)
+        """
+
+        kind, player, data = event
+        code = KIND2CODE[kind]
+        seat = seats[player]
+
+        if code == ROLL:
+            self.append(code, seat, data["die1"], data["die2"])
+        elif code in (MOVE, JAIL):
+            self.append(code, seat, data["start"], data["end"])
+        elif code == ORDER:
+            self.append(code, seat, data["roll"])
+        elif code == JAIL_WAIT:
+            self.append(code, seat, data["turns_left"])
+        elif code in (SALARY, FREE_PARKING, CARD_PAYMENT, CARD_INCOME):
+            self.append(code, seat, amount = data["amount"])
+        elif code in (PURCHASE, CANNOT_AFFORD):
+            self.append(code, seat, data["tile"].get_board_pos(), amount = data["price"])
+        elif code == RENT:
+            self.append(
+                code, seat,
+                data["tile"].get_board_pos(), seats[data["owner"]], data["amount"]
+            )
+        elif code in (TAX, MORTGAGE):
+            self.append(code, seat, data["tile"].get_board_pos(), amount = data["amount"])
+        elif code == BUILD:
+            self.append(
+                code, seat, data["tile"].get_board_pos(), data["houses"], data["amount"]
+            )
+        elif code == TRADE:
+            receiver = seats[data["receiver"]]
+            self.append(code, seat, receiver, amount = data["amount"])
+
+            for owner, tiles in ((receiver, data["give"]), (seat, data["take"])):
+                for tile in tiles:
+                    self.append(TRADE_TILE, owner, tile.get_board_pos())
+        elif code in (CARD, JAIL_CARD):
+            self.append(code, seat, DECK2CODE[data["deck"]], data["card"])
+        elif code == CARD_TRANSFER:
+            self.append(code, seat, seats[data["receiver"]], amount = data["amount"])
+        else:
+            self.append(code, seat)
+
+    def records(self):
+        """ Iterate the raw records
+
+        Yields:
+            (kind, seat, a, b, amount)
+        """
+
+        return RECORD.iter_unpack(self.buffer)
+
+    def events(self):
+        """ Iterate the records with the name of their kind """
+
+        for kind, seat, a, b, amount in self.records():
+            yield KINDS[kind], seat, a, b, amount
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, len(self.player_names))
+
+        for name in self.player_names:
+            encoded = name.encode()
+            header += struct.pack("<B", len(encoded)) + encoded
+
+        return header + bytes(self.buffer)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, nb_players = HEADER.unpack_from(data)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not an event log of version {VERSION}")
+
+        offset = HEADER.size
+        player_names = []
+
+        for i in range(nb_players):
+            length = data[offset]
+            player_names.append(bytes(data[offset + 1:offset + 1 + length]).decode())
+            offset += 1 + length
+
+        log = cls(player_names)
+        log.buffer = bytearray(data[offset:])
+
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as log_file:
+            log_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as log_file:
+            return cls.from_bytes(log_file.read())
+
+    @classmethod
+    def split_archive(cls, data):
+        """ Logs of an archive written by save_archive """
+
+        offset = 0
+
+        while offset < len(data):
+            (length,) = ARCHIVE_LENGTH.unpack_from(data, offset)
+            offset += ARCHIVE_LENGTH.size
+            yield cls.from_bytes(data[offset:offset + length])
+            offset += length
+
+    @classmethod
+    def load_archive(cls, path):
+        with open(path, "rb") as archive_file:
+            return list(cls.split_archive(archive_file.read()))
+
+    def replay(self, nb_tiles = None):
+        """ Apply every record on a new game
+
+        Args:
+            nb_tiles (int): size of the board played, core.BOARD when None
+        Returns:
+            state (GameState.GameState) at the end of the log
+        """
+
+        if nb_tiles is None:
+            nb_tiles = core.BOARD.nb_tiles
+
+        state = GameState.GameState(nb_tiles, len(self.player_names))
+        players = state.players
+        order = []
+
+        for kind, seat, a, b, amount in RECORD.iter_unpack(self.buffer):
+            player = players[seat]
+
+            if kind == ROLL:
+                if a == b and player.jail_status == 0:
+                    state.doubles += 1
+            elif kind == MOVE:
+                player.position = b
+            elif kind == TURN:
+                state.doubles = 0
+                state.turn = state.order.index(seat)
+            elif kind == RENT:
+                player.balance -= amount
+                players[b].balance += amount
+            elif kind == SALARY:
+                player.balance += amount
+            elif kind == TAX:
+                player.balance -= amount
+                state.free_parking += amount
+            elif kind == PURCHASE:
+                player.balance -= amount
+                state.owner[a] = seat
+            elif kind == JAIL:
+                player.position = b
+                player.jail_status = 3
+            elif kind == JAIL_WAIT:
+                player.jail_status = a
+            elif kind == JAIL_RELEASE:
+                player.jail_status = 0
+            elif kind == FREE_PARKING:
+                player.balance += amount
+                state.free_parking = 0
+            elif kind == MORTGAGE:
+                player.balance += amount
+                state.owner[a] = GameState.NO_OWNER
+                state.houses[a] = 0
+                state.hotel[a] = 0
+            elif kind == BUILD:
+                player.balance -= amount
+
+                if b == 5:
+                    state.houses[a] = 0
+                    state.hotel[a] = 1
+                else:
+                    state.houses[a] = b
+            elif kind == ELIMINATION:
+                player.alive = False
+                state.doubles = 0
+                index = state.order.index(seat)
+                state.order.pop(index)
+
+                if index < state.turn:
+                    state.turn -= 1
+
+                state.turn %= len(state.order)
+
+                for board_pos, owner in enumerate(state.owner):
+                    if owner == seat:
+                        state.owner[board_pos] = GameState.NO_OWNER
+                        state.houses[board_pos] = 0
+                        state.hotel[board_pos] = 0
+            elif kind == TRADE:
+                player.balance -= amount
+                players[a].balance += amount
+            elif kind == TRADE_TILE:
+                state.owner[a] = seat
+            elif kind == CARD_PAYMENT:
+                player.balance -= amount
+                state.free_parking += amount
+            elif kind == CARD_INCOME:
+                player.balance += amount
+            elif kind == CARD_TRANSFER:
+                player.balance -= amount
+                players[a].balance += amount
+            elif kind == JAIL_CARD:
+                player.jail_status = 0
+            elif kind == ORDER:
+                order.append(seat)
+                state.order = array("b", order)
+                state.turn = 0
+
+        return state
+
+    def landings(self, nb_tiles = None):
+        """ Number of times each tile was landed on
+
+        Args:
+            nb_tiles (int): size of the board played, core.BOARD when None
+        Returns:
+            list of int
+        """
+
+        if nb_tiles is None:
+            nb_tiles = core.BOARD.nb_tiles
+
+        counts = [0] * nb_tiles
+
+        for kind, seat, a, b, amount in RECORD.iter_unpack(self.buffer):
+            if kind == MOVE:
+                counts[b] += 1
+
+        return counts
+
+
+def save_archive(path, logs):
+    """ Write many logs in one file, each prefixed by its length """
+
+    with open(path, "wb") as archive_file:
+        for log in logs:
+            data = log.to_bytes()
+            archive_file.write(ARCHIVE_LENGTH.pack(len(data)))
+            archive_file.write(data)
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1014 @@
+""" Headless game engine
+
+All the rules of the game without any Qt dependency. The engine owns the
+board, the players and the turn state, every turn returns the list of
+events that happened so the GUI only has to render them.
+"""
+
+from array import array
+from collections import namedtuple
+import struct
+
+from . import board_data
+from . import core
+from . import Deck
+from . import Dice
+from . import EventLog
+from . import GameState
+from . import Player
+from . import Profiler
+from . import rent_table
+from . import Strategy
+from . import Trade
+
+
+Event = namedtuple("Event", ["kind", "player", "data"])
+
+SNAPSHOT_MAGIC = b"MNSS"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct("<4sBQQI")
+
+# the decks are shuffled with the streams DECK_STREAM + index of the game dice
+DECK_STREAM = 1 << 16
+
+
+class EngineTile:
+    """ Rules side of a tile, same getters as the Qt Tile """
+
+    __slots__ = (
+        "name", "kind", "board_pos", "price", "rent", "mortgage", "color",
+        "group_name", "number_in_group", "house_price", "rents",
+        "owner", "nb_houses", "hotel",
+    )
+
+    def __init__(self, name, kind, board_pos, price, rent, mortgage, color,
+                 group_name, number_in_group, house_price, rents = rent_table.DEFAULT,
+    ):
+        self.name = name
+        self.kind = kind
+        self.board_pos = board_pos
+        self.price = price
+        self.rent = rent
+        self.mortgage = mortgage
+        self.color = color
+        self.group_name = group_name
+        self.number_in_group = number_in_group
+        self.house_price = house_price
+        self.rents = rents
+        self.owner = False
+        self.nb_houses = 0
+        self.hotel = False
+
+    def copy(self):
+        """ Same tile with the same owner and development """
+
+        tile = EngineTile.__new__(EngineTile)
+
+        for name in self.__slots__:
+            setattr(tile, name, getattr(self, name))
+
+        return tile
+
+    def is_owned(self):
+        if self.owner:
+            return True
+        else:
+            return False
+
+    def set_owner(self, player):
+        self.owner = player
+
+    def get_owner(self):
+        return self.owner
+
+    def remove_owner(self):
+        self.owner = False
+        self.nb_houses = 0
+        self.hotel = False
+
+    def add_houses(self, number):
+        self.nb_houses += number
+
+    def add_hotel(self):
+        self.nb_houses = 0
+        self.hotel = True
+
+    def has_hotel(self):
+        return self.hotel
+
+    def get_name(self):
+        return self.name
+
+    def get_kind(self):
+        return self.kind
+
+    def get_board_pos(self):
+        return self.board_pos
+
+    def get_price(self):
+        return self.price
+
+    def get_rent(self, sum_dice = 0):
+        """ Rent from the rent table, the tile must be owned
+
+        Args:
+            sum_dice (int): roll that brought the player, for utilities
+        """
+
+        return rent_table.get_rent(
+            self.board_pos,
+            rent_table.level_of(self.nb_houses, self.hotel),
+            self.owner.group_possessions[self.group_name],
+            sum_dice,
+            self.rents,
+        )
+
+    def get_mortgage(self):
+        return self.mortgage
+
+    def get_color(self):
+        return self.color
+
+    def get_group(self):
+        return self.group_name
+
+    def get_nb_houses(self):
+        return self.nb_houses
+
+    def get_house_price(self):
+        return self.house_price
+
+    def get_number_in_group(self):
+        return self.number_in_group
+
+
+def build_tiles(board = None):
+    """ Create the tiles of the board from the compiled board tables
+
+    Args:
+        board (board_data.BoardTables): core.BOARD when None
+    Returns:
+        tiles (list of EngineTile), indexed by board position
+    """
+
+    board = board or core.BOARD
+    rents = rent_table.for_board(board)
+    tiles = []
+
+    for board_pos in range(board.nb_tiles):
+        rent, mortgage = None, None
+        color, group, number, house_price = None, None, None, None
+        group_index = board.groups[board_pos]
+
+        if group_index is not None:
+            price = board.prices[board_pos]
+            rent = board.rents[board_pos]
+            mortgage = price / 2
+            color = board.colors[board_pos]
+            group = board.group_names[group_index]
+            number = board.group_sizes[group_index]
+            house_price = board.group_house_prices[group_index]
+        else:
+            price = board.values[board_pos]
+
+        tiles.append(
+            EngineTile(
+                board.names[board_pos], board.kinds[board_pos], board_pos,
+                price, rent, mortgage,
+                color, group, number, house_price, rents,
+            )
+        )
+
+    return tiles
+
+
+class GameEngine:
+    """ Game rules and state, no display
+
+    Decisions are delegated to the Strategy of each player, players
+    missing from strategies get the base Strategy.
+
+    dice is the Dice.Dice stream of the game, a randomly seeded one when None
+    board is the board_data.BoardTables played, core.BOARD when None. Any
+    board size works and up to GameState.MAX_PLAYERS players
+    log keeps every event in the EventLog self.log, None without it
+
+    Raises:
+        ValueError: more players than GameState.MAX_PLAYERS
+    """
+
+    def __init__(self, players, strategies = None, dice = None, board = None, log = False):
+        self.players = list(players)
+
+        if len(self.players) > GameState.MAX_PLAYERS:
+            raise ValueError(
+                f"A game has at most {GameState.MAX_PLAYERS} players, got {len(self.players)}"
+            )
+
+        self.dice = dice if dice is not None else Dice.Dice()
+        self.ordered_players = list(self.players)
+        self.board = board or core.BOARD
+        self.jail_pos = self.board.jail_pos
+        self.tiles = build_tiles(self.board)
+        self.name2tile = {}
+
+        for tile in self.tiles:
+            self.name2tile.setdefault(tile.get_name(), tile)
+
+        self.positions = {player: 0 for player in self.players}
+        self.free_parking = 0
+        self.doubles = 0
+        self.sum_dice = 0
+        self.turn = 0
+        self.winner = None
+
+        strategies = strategies or {}
+        default_strategy = Strategy.Strategy()
+        self.strategies = {
+            player: strategies.get(player, default_strategy) for player in self.players
+        }
+
+        self.listeners = []
+        self.events = []
+
+        self.seats = {player: seat for seat, player in enumerate(self.players)}
+        self.log = None
+
+        if log:
+            self.log = EventLog.EventLog([str(player) for player in self.players])
+            self.add_listener(self.record)
+
+        self.shuffle_decks()
+
+    def reset(self, dice = None):
+        """ Back to the start of a game with the same players, strategies
+        and listeners, with a new event log if logged. The players have to be
+        ordered again
+
+        Args:
+            dice (Dice.Dice): stream of the new game, the current stream
+                goes on when None
+        """
+
+        self.set_state(GameState.GameState(len(self.tiles), len(self.players)))
+
+        if dice is not None:
+            self.dice = dice
+
+        self.shuffle_decks()
+        self.sum_dice = 0
+        self.events = []
+
+        if self.log is not None:
+            self.log = EventLog.EventLog([str(player) for player in self.players])
+
+    def shuffle_decks(self):
+        """ New decks of cards for the board, shuffled from the game dice """
+
+        self.decks = {
+            kind: Deck.Deck(self.board.deck_cards[kind], self.dice.split(DECK_STREAM + index))
+            for index, kind in enumerate(board_data.DECK_KINDS)
+        }
+
+    def add_listener(self, listener):
+        """ Call listener(event) every time an event happens """
+        self.listeners.append(listener)
+
+    def record(self, event):
+        """ Keep every event in the binary log """
+        self.log.encode(event, self.seats)
+
+    def emit(self, kind, player, **data):
+        event = Event(kind, player, data)
+        self.events.append(event)
+
+        for listener in self.listeners:
+            listener(event)
+
+        return event
+
+    def get_current_player(self):
+        return self.ordered_players[self.turn]
+
+    def get_position(self, player):
+        return self.positions[player]
+
+    def get_player_tile(self, player):
+        return self.tiles[self.positions[player]]
+
+    def get_tile(self, tile_name = None, tile_pos = None):
+        """ Get tile object from name or pos
+
+        Args:
+            tile_name (str)
+            tile_pos (int)
+        Returns:
+            tile (EngineTile)
+        """
+
+        if tile_name is not None:
+            return self.name2tile.get(tile_name)
+
+        return self.tiles[tile_pos]
+
+    def is_over(self):
+        return self.winner is not None
+
+    def order_players(self):
+        """ roll dice for players and order them
+
+        Returns: list of (roll, player), best roll first
+        """
+
+        rolls = [self.dice.roll()[2] for player in self.players]
+
+        rolls_players = sorted(zip(rolls, self.players), key = lambda x: -x[0])
+        self.ordered_players = [player for roll, player in rolls_players]
+        self.turn = 0
+
+        for roll, player in rolls_players:
+            self.emit("order", player, roll = roll)
+
+        return rolls_players
+
+    def pass_player_turn(self):
+        """ Next player, back to the first one when over """
+
+        self.doubles = 0
+        self.turn = (self.turn + 1) % len(self.ordered_players)
+        self.emit("turn", self.get_current_player())
+
+    def play_turn(self, dice = None):
+        """ Play the turn of the current player
+
+        Trade and build what the strategy wants
+        Roll dice
+        Move player
+        Interact with the board
+        Pass the turn
+
+        Args:
+            dice (tuple of int): forced die values, rolled when None
+        Returns:
+            events (list of Event)
+        """
+
+        self.events = []
+
+        if self.is_over():
+            return self.events
+
+        player = self.get_current_player()
+        self.negotiate(player)
+        self.build(player)
+
+        if dice is None:
+            die1, die2, sum_dice = self.dice.roll()
+        else:
+            die1, die2 = dice
+            sum_dice = die1 + die2
+
+        self.sum_dice = sum_dice
+
+        if player.in_jail():
+            self.use_jail_card(player)
+
+        self.emit("roll", player, die1 = die1, die2 = die2, total = sum_dice)
+
+        if player.in_jail():
+            if die1 == die2:
+                player.out_of_jail()
+                self.emit("jail_release", player)
+            else:
+                player.pass_turn()
+
+                if player.in_jail() == 0:
+                    self.emit("jail_release", player)
+                else:
+                    self.emit("jail_wait", player, turns_left = player.in_jail())
+
+            self.pass_player_turn()
+
+        else:
+            tile, passed_start = self.move_player(player, sum_dice)
+            self.interact_board(player, tile, passed_start)
+
+            if self.is_over():
+                # a card collecting from each player can eliminate the
+                # last opponent of the player
+                self.doubles = 0
+
+            elif player not in self.ordered_players:
+                # eliminated, the next player already took its seat
+                self.doubles = 0
+                self.emit("turn", self.get_current_player())
+
+            elif player.in_jail():
+                self.pass_player_turn()
+
+            elif die1 == die2:
+                self.doubles += 1
+
+                if self.doubles == 3:
+                    self.send_player_to_jail(player)
+                    self.pass_player_turn()
+            else:
+                self.pass_player_turn()
+
+        return self.events
+
+    def move_player(self, player, steps):
+        """ Move player on the board
+
+        Args:
+            player (Player)
+            steps (int)
+        Returns:
+            new_tile (EngineTile)
+            passed_start (bool)
+        """
+
+        passed_start = False
+        current_board_pos = self.positions[player]
+        new_board_pos = current_board_pos + steps
+
+        # if player gets passed last position of the board
+        # "reset" the number to loop through the board, a roll can go
+        # round a tiny board more than once
+        if new_board_pos >= len(self.tiles):
+            new_board_pos %= len(self.tiles)
+            passed_start = True
+
+        self.positions[player] = new_board_pos
+        self.emit("move", player, start = current_board_pos, end = new_board_pos)
+
+        return self.tiles[new_board_pos], passed_start
+
+    def move_player_to(self, player, board_pos, forward = True):
+        """ Move player straight to board_pos
+
+        Args:
+            forward (bool): going forward passes Start when board_pos is
+                behind the player, going backward never does
+        Returns:
+            new_tile (EngineTile)
+            passed_start (bool)
+        """
+
+        current_board_pos = self.positions[player]
+        self.positions[player] = board_pos
+        self.emit("move", player, start = current_board_pos, end = board_pos)
+
+        return self.tiles[board_pos], forward and board_pos < current_board_pos
+
+    def send_player_to_jail(self, player):
+        """ Send the player to jail """
+
+        current_board_pos = self.positions[player]
+        self.positions[player] = self.jail_pos
+        player.go_to_jail()
+        self.emit("jail", player, start = current_board_pos, end = self.jail_pos)
+
+    def interact_board(self, player, tile, passed_start):
+        """ Interaction with the board
+
+        Buy properties, pay rent, pay taxes...
+
+        Args:
+            player (Player)
+            tile (EngineTile)
+            passed_start (bool)
+        """
+
+        kind = tile.get_kind()
+
+        # Check that player didn't landed on Start or Jail before giving start money
+        if passed_start and kind not in ["start", "go_to_jail"]:
+            start_money = self.board.salary
+            player.receive(start_money)
+            self.emit("salary", player, amount = start_money)
+
+        if kind == "property":
+            if tile.is_owned():
+                owner = tile.get_owner()
+
+                if owner != player:
+                    rent = tile.get_rent(self.sum_dice)
+
+                    if self.settle_debt(player, rent):
+                        owner.receive(rent)
+                        self.emit("rent", player, tile = tile, owner = owner, amount = rent)
+
+            else:
+                price = tile.get_price()
+
+                if player.get_balance() < price:
+                    self.emit("cannot_afford", player, tile = tile, price = price)
+                elif self.strategies[player].decide_buy(self, player, tile):
+                    player.add_possession(tile)
+                    tile.set_owner(player)
+                    self.emit("purchase", player, tile = tile, price = price)
+
+        elif kind == "start":
+            tile_value = tile.get_price()
+            player.receive(tile_value * 2)
+            self.emit("salary", player, amount = tile_value * 2)
+
+        elif kind == "tax":
+            tile_value = tile.get_price()
+
+            if self.settle_debt(player, tile_value):
+                self.free_parking += tile_value
+                self.emit("tax", player, tile = tile, amount = tile_value)
+
+        elif kind == "go_to_jail":
+            self.send_player_to_jail(player)
+
+        elif kind == "free_parking":
+            amount = self.free_parking
+            player.receive(amount)
+            self.free_parking = 0
+            self.emit("free_parking", player, amount = amount)
+
+        elif kind in self.decks:
+            self.draw_card(player, kind)
+
+    def draw_card(self, player, kind):
+        """ Draw a card from the deck of kind and apply it
+
+        Moves interact with the tile reached, payments go to Free Parking
+        like taxes
+
+        Args:
+            player (Player)
+            kind (str): one of board_data.DECK_KINDS
+        """
+
+        deck = self.decks[kind]
+        card = deck.draw()
+
+        if card is None:
+            return
+
+        board = self.board
+        action = board.card_actions[card]
+        value = board.card_values[card]
+        self.emit("card", player, deck = kind, card = card, text = board.card_texts[card])
+
+        if action == "move_to":
+            tile, passed_start = self.move_player_to(player, value)
+            self.interact_board(player, tile, passed_start)
+
+        elif action == "move_back_to":
+            tile, passed_start = self.move_player_to(player, value, forward = False)
+            self.interact_board(player, tile, passed_start)
+
+        elif action == "move_by":
+            if value >= 0:
+                tile, passed_start = self.move_player(player, value)
+            else:
+                board_pos = (self.positions[player] + value) % len(self.tiles)
+                tile, passed_start = self.move_player_to(player, board_pos, forward = False)
+
+            self.interact_board(player, tile, passed_start)
+
+        elif action == "go_to_jail":
+            self.send_player_to_jail(player)
+
+        elif action == "pay":
+            if self.settle_debt(player, value):
+                self.free_parking += value
+                self.emit("card_payment", player, amount = value)
+
+        elif action == "collect":
+            player.receive(value)
+            self.emit("card_income", player, amount = value)
+
+        elif action == "pay_each":
+            for other in list(self.ordered_players):
+                if other is player:
+                    continue
+
+                if not self.settle_debt(player, value):
+                    break
+
+                other.receive(value)
+                self.emit("card_transfer", player, receiver = other, amount = value)
+
+        elif action == "collect_each":
+            for other in list(self.ordered_players):
+                if other is not player and self.settle_debt(other, value):
+                    player.receive(value)
+                    self.emit("card_transfer", other, receiver = player, amount = value)
+
+        elif action == "jail_card":
+            deck.hold(card, player)
+
+    def use_jail_card(self, player):
+        """ Get out of jail with a card the player holds
+
+        Returns:
+            bool: False if the player has no card
+        """
+
+        for kind, deck in self.decks.items():
+            card = deck.release(player)
+
+            if card is not None:
+                player.out_of_jail()
+                self.emit("jail_card", player, deck = kind, card = card)
+                return True
+
+        return False
+
+    def settle_debt(self, player, amount):
+        """ Take amount from the player, mortgaging or eliminating if needed
+
+        Returns:
+            bool: True if the amount was paid
+        """
+
+        if player.get_balance() < amount:
+            if self.player_bankrupt(player, amount):
+                self.player_lost(player)
+                return False
+
+            chosen = self.strategies[player].decide_mortgage(self, player, amount)
+            self.mortgage(player, chosen)
+
+            if player.get_balance() < amount:
+                self.mortgage(player, Strategy.mortgage_cheapest(self, player, amount))
+
+        player.pay(amount)
+        return True
+
+    def mortgage(self, player, tiles):
+        """ Give the tiles back to the bank for their mortgage value """
+
+        for tile in tiles:
+            if tile.get_owner() != player:
+                continue
+
+            player.remove_possession(tile)
+            tile.remove_owner()
+            self.emit("mortgage", player, tile = tile, amount = tile.get_mortgage())
+
+    def player_bankrupt(self, player, amount):
+        """ Check for player's money and real estate to see if bankrupt
+
+        Returns: bool
+        """
+
+        real_estate = sum(tile.get_mortgage() for tile in player.get_possessions())
+
+        if player.get_balance() + real_estate < amount:
+            return True
+        else:
+            return False
+
+    def player_lost(self, player):
+        """ Remove the player from the game, properties go back to the bank """
+
+        for tile in player.get_possessions():
+            tile.remove_owner()
+
+        player.release_possessions()
+
+        for deck in self.decks.values():
+            deck.release(player)
+
+        index = self.ordered_players.index(player)
+        self.ordered_players.remove(player)
+
+        if index < self.turn:
+            self.turn -= 1
+
+        self.turn %= len(self.ordered_players)
+        self.emit("elimination", player)
+
+        if len(self.ordered_players) == 1:
+            self.winner = self.ordered_players[0]
+            self.emit("game_over", self.winner)
+
+    def get_state(self):
+        """ Compact copy of the game
+
+        Returns:
+            state (GameState.GameState)
+        """
+
+        seats = self.seats
+        state = GameState.GameState(len(self.tiles), len(self.players))
+
+        for tile in self.tiles:
+            if tile.is_owned():
+                board_pos = tile.get_board_pos()
+                state.owner[board_pos] = seats[tile.get_owner()]
+                state.houses[board_pos] = tile.get_nb_houses()
+                state.hotel[board_pos] = tile.has_hotel()
+
+        for player, player_state in zip(self.players, state.players):
+            player_state.balance = player.get_balance()
+            player_state.position = self.positions[player]
+            player_state.jail_status = player.in_jail()
+            player_state.alive = player in self.ordered_players
+
+        state.order = array("b", [seats[player] for player in self.ordered_players])
+        state.turn = self.turn
+        state.doubles = self.doubles
+        state.free_parking = self.free_parking
+
+        return state
+
+    def set_state(self, state):
+        """ Put the game back in the state given by get_state
+
+        Args:
+            state (GameState.GameState)
+        """
+
+        for player, player_state in zip(self.players, state.players):
+            player.balance = player_state.balance
+            player.jail_status = player_state.jail_status
+            player.release_possessions()
+            self.positions[player] = player_state.position
+
+        for tile, owner, nb_houses, hotel in zip(
+            self.tiles, state.owner, state.houses, state.hotel
+        ):
+            if owner == GameState.NO_OWNER:
+                tile.remove_owner()
+            else:
+                player = self.players[owner]
+                tile.set_owner(player)
+                tile.nb_houses = nb_houses
+                tile.hotel = bool(hotel)
+                player.take_possession(tile)
+
+        self.ordered_players = [self.players[seat] for seat in state.order]
+        self.turn = state.turn
+        self.doubles = state.doubles
+        self.free_parking = state.free_parking
+
+        if len(self.ordered_players) == 1:
+            self.winner = self.ordered_players[0]
+        else:
+            self.winner = None
+
+    def snapshot(self):
+        """ Whole game in a flat binary buffer: the dice stream position,
+        GameState.to_bytes and the decks in the order of DECK_KINDS
+
+        Returns: bytes
+        """
+
+        state = self.get_state().to_bytes()
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.dice.key, self.dice.get_counter(), len(state)
+        )
+        decks = [self.decks[kind].to_bytes(self.seats) for kind in board_data.DECK_KINDS]
+
+        return b"".join([header, state] + decks)
+
+    def restore(self, data):
+        """ Put the game back in the state of a snapshot, the players are
+        matched by seat, the event log is left as it is
+
+        Raises:
+            ValueError: not a snapshot of this version, of this number of
+                players or of this board size
+        """
+
+        magic, version, key, counter, state_size = SNAPSHOT_HEADER.unpack_from(data)
+
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Not a snapshot of version {SNAPSHOT_VERSION}")
+
+        offset = SNAPSHOT_HEADER.size + state_size
+        state = GameState.GameState.from_bytes(data[SNAPSHOT_HEADER.size:offset])
+
+        if len(state.players) != len(self.players):
+            raise ValueError(
+                f"Snapshot of {len(state.players)} players, the game has {len(self.players)}"
+            )
+
+        if len(state.owner) != len(self.tiles):
+            raise ValueError(
+                f"Snapshot of a board of {len(state.owner)} tiles, the game has {len(self.tiles)}"
+            )
+
+        self.set_state(state)
+        self.dice = Dice.Dice(key = key)
+        self.dice.set_counter(counter)
+        self.shuffle_decks()
+
+        for kind in board_data.DECK_KINDS:
+            offset = self.decks[kind].load_bytes(data, offset, self.players)
+
+    def clone(self):
+        """ Independent copy of the game for look-ahead
+
+        Players and tiles are copied, strategies are shared. The copy has
+        no listeners and no event log, its dice continue the same stream.
+
+        Returns:
+            engine (GameEngine)
+        """
+
+        engine = GameEngine.__new__(GameEngine)
+        old2new = {}
+
+        for old_player in self.players:
+            player = Player.Player(old_player.get_name())
+            player.balance = old_player.balance
+            player.jail_status = old_player.jail_status
+            old2new[old_player] = player
+
+        engine.board = self.board
+        engine.jail_pos = self.jail_pos
+        engine.tiles = [tile.copy() for tile in self.tiles]
+
+        for old_player, player in old2new.items():
+            for old_tile in old_player.get_possessions():
+                tile = engine.tiles[old_tile.get_board_pos()]
+                tile.owner = player
+                player.take_possession(tile)
+
+        engine.players = list(old2new.values())
+        engine.ordered_players = [old2new[player] for player in self.ordered_players]
+        engine.name2tile = {
+            name: engine.tiles[tile.get_board_pos()] for name, tile in self.name2tile.items()
+        }
+        engine.positions = {old2new[player]: pos for player, pos in self.positions.items()}
+        engine.strategies = {
+            old2new[player]: strategy for player, strategy in self.strategies.items()
+        }
+        engine.seats = {player: seat for seat, player in enumerate(engine.players)}
+        engine.dice = self.dice.copy()
+        engine.decks = {kind: deck.copy(old2new) for kind, deck in self.decks.items()}
+        engine.free_parking = self.free_parking
+        engine.doubles = self.doubles
+        engine.sum_dice = self.sum_dice
+        engine.turn = self.turn
+        engine.winner = old2new.get(self.winner)
+        engine.listeners = []
+        engine.events = []
+        engine.log = None
+
+        return engine
+
+    def get_buildable_tiles(self, player):
+        """ Tiles of the player's complete groups with their number of houses
+
+        Returns:
+            tile2houses (dict of EngineTile: int), hotels excluded, in
+                board order so decisions don't depend on the buying order
+        """
+
+        tile2houses = {}
+
+        if not player.get_complete_groups():
+            return tile2houses
+
+        tiles = [tile for tiles in player.has_one_group().values() for tile in tiles]
+
+        for tile in sorted(tiles, key = lambda x: x.get_board_pos()):
+            if tile.get_house_price() is not None and not tile.has_hotel():
+                tile2houses[tile] = tile.get_nb_houses()
+
+        return tile2houses
+
+    def negotiate(self, player):
+        """ Settle the offers of the player's strategy the receivers accept """
+
+        for offer in self.strategies[player].propose_trades(self, player):
+            if Trade.check_offer(self, offer) is not None:
+                continue
+
+            if self.strategies[offer.receiver].accept_trade(self, offer.receiver, offer):
+                self.trade(offer)
+
+    def trade(self, offer):
+        """ Exchange the properties and the cash of an offer at once
+
+        Args:
+            offer (Trade.Offer)
+        Returns:
+            bool: False if the offer isn't valid, see Trade.check_offer
+        """
+
+        if Trade.check_offer(self, offer) is not None:
+            return False
+
+        proposer, receiver = offer.proposer, offer.receiver
+
+        # every tile leaves before any arrives so the groups are only
+        # completed once the exchange is done
+        for tile in offer.give:
+            proposer.give_up_possession(tile)
+
+        for tile in offer.take:
+            receiver.give_up_possession(tile)
+
+        for tile in offer.give:
+            tile.set_owner(receiver)
+            receiver.take_possession(tile)
+
+        for tile in offer.take:
+            tile.set_owner(proposer)
+            proposer.take_possession(tile)
+
+        proposer.pay(offer.cash)
+        receiver.receive(offer.cash)
+        self.emit(
+            "trade", proposer,
+            receiver = receiver, give = list(offer.give), take = list(offer.take),
+            amount = offer.cash,
+        )
+
+        return True
+
+    def build(self, player):
+        """ Build what the strategy of the player decides """
+
+        tile2nb_houses, hotel_tiles = self.strategies[player].decide_build(self, player)
+
+        if hotel_tiles:
+            self.build_hotel(player, hotel_tiles)
+
+        if tile2nb_houses:
+            self.build_houses(player, tile2nb_houses)
+
+    def build_houses(self, player, tile2nb_houses):
+        """ Buy houses on tiles of complete groups
+
+        Args:
+            player (Player)
+            tile2nb_houses (dict of EngineTile: int)
+        Returns:
+            bool: False if the player can't build or pay
+        """
+
+        buildable = self.get_buildable_tiles(player)
+        total_price = 0
+
+        for tile, nb_houses in tile2nb_houses.items():
+            if tile not in buildable or buildable[tile] + nb_houses > 4:
+                return False
+
+            total_price += tile.get_house_price() * nb_houses
+
+        if total_price > player.get_balance():
+            return False
+
+        for tile, nb_houses in tile2nb_houses.items():
+            if nb_houses:
+                player.pay(tile.get_house_price() * nb_houses)
+                tile.add_houses(nb_houses)
+                self.emit(
+                    "build", player,
+                    tile = tile, houses = tile.get_nb_houses(),
+                    amount = tile.get_house_price() * nb_houses
+                )
+
+        return True
+
+    def build_hotel(self, player, tiles):
+        """ Buy hotels on tiles with 4 houses
+
+        Args:
+            player (Player)
+            tiles (list of EngineTile)
+        Returns:
+            bool: False if the player can't build or pay
+        """
+
+        buildable = self.get_buildable_tiles(player)
+
+        if any(buildable.get(tile) != 4 for tile in tiles):
+            return False
+
+        hotel_price = sum(tile.get_house_price() for tile in tiles)
+
+        if hotel_price > player.get_balance():
+            return False
+
+        for tile in tiles:
+            player.pay(tile.get_house_price())
+            tile.add_hotel()
+            self.emit("build", player, tile = tile, houses = 5, amount = tile.get_house_price())
+
+        return True
+
+
+Profiler.register(GameEngine, [
+    "play_turn", "negotiate", "trade", "build", "move_player", "draw_card", "interact_board", "settle_debt",
+    "player_bankrupt", "mortgage", "player_lost", "send_player_to_jail",
+])
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
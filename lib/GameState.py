@@ -0,0 +1,159 @@
+""" Compact representation of a game
+
+Fixed size arrays for the tiles and small slotted records for the
+players, so a game state is cheap to copy and to keep by the million.
+Players are referred to by their seat, their index in GameEngine.players.
+A state serializes to a flat versioned buffer:
+    header, owner, houses, hotel, order, one record per player
+Seats are stored in signed bytes, so a game has at most MAX_PLAYERS
+players, and positions in 2 bytes.
+"""
+
+from array import array
+import struct
+
+
+NO_OWNER = -1
+MAX_PLAYERS = 127
+
+MAGIC = b"MNGS"
+VERSION = 1
+HEADER = struct.Struct("<4sBHBBBBi")
+PLAYER = struct.Struct("<iHBB")
+
+
+class PlayerState:
+    """ Money, position and jail status of one seat """
+
+    __slots__ = ("balance", "position", "jail_status", "alive")
+
+    def __init__(self, balance = 1500, position = 0, jail_status = 0, alive = True):
+        self.balance = balance
+        self.position = position
+        self.jail_status = jail_status
+        self.alive = alive
+
+    def copy(self):
+        return PlayerState(self.balance, self.position, self.jail_status, self.alive)
+
+    def __eq__(self, other):
+        if not isinstance(other, PlayerState):
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+class GameState:
+    """ Whole game in flat arrays
+
+    owner: seat owning each tile, NO_OWNER for the bank
+    houses: number of houses on each tile
+    hotel: 1 if the tile has a hotel
+    order: seats still in the game in turn order
+    """
+
+    __slots__ = (
+        "owner", "houses", "hotel",
+        "players", "order", "turn", "doubles", "free_parking",
+    )
+
+    def __init__(self, nb_tiles, nb_players = 0):
+        self.owner = array("b", [NO_OWNER]) * nb_tiles
+        self.houses = array("b", [0]) * nb_tiles
+        self.hotel = array("b", [0]) * nb_tiles
+        self.players = [PlayerState() for i in range(nb_players)]
+        self.order = array("b", range(nb_players))
+        self.turn = 0
+        self.doubles = 0
+        self.free_parking = 0
+
+    def copy(self):
+        """ Independent copy, arrays are copied with a slice """
+
+        state = GameState.__new__(GameState)
+        state.owner = self.owner[:]
+        state.houses = self.houses[:]
+        state.hotel = self.hotel[:]
+        state.players = [player.copy() for player in self.players]
+        state.order = self.order[:]
+        state.turn = self.turn
+        state.doubles = self.doubles
+        state.free_parking = self.free_parking
+
+        return state
+
+    def to_bytes(self):
+        header = HEADER.pack(
+            MAGIC, VERSION, len(self.owner), len(self.players), len(self.order),
+            self.turn, self.doubles, int(self.free_parking),
+        )
+        players = b"".join(
+            PLAYER.pack(int(player.balance), player.position, player.jail_status, player.alive)
+            for player in self.players
+        )
+
+        return b"".join((
+            header,
+            self.owner.tobytes(), self.houses.tobytes(), self.hotel.tobytes(),
+            self.order.tobytes(), players,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ State written by to_bytes
+
+        Raises:
+            ValueError: not a state of this version
+        """
+
+        if len(data) < HEADER.size:
+            raise ValueError("Truncated game state")
+
+        (
+            magic, version, nb_tiles, nb_players, nb_order, turn, doubles, free_parking,
+        ) = HEADER.unpack_from(data)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a game state of version {VERSION}")
+
+        if len(data) != HEADER.size + 3 * nb_tiles + nb_order + nb_players * PLAYER.size:
+            raise ValueError("Truncated game state")
+
+        state = cls.__new__(cls)
+        offset = HEADER.size
+
+        for name in ("owner", "houses", "hotel"):
+            values = array("b")
+            values.frombytes(data[offset:offset + nb_tiles])
+            setattr(state, name, values)
+            offset += nb_tiles
+
+        state.order = array("b")
+        state.order.frombytes(data[offset:offset + nb_order])
+        offset += nb_order
+
+        state.players = [
+            PlayerState(balance, position, jail_status, bool(alive))
+            for balance, position, jail_status, alive in PLAYER.iter_unpack(data[offset:])
+        ]
+        state.turn = turn
+        state.doubles = doubles
+        state.free_parking = free_parking
+
+        return state
+
+    def get_current_seat(self):
+        return self.order[self.turn]
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,19 @@
 from functools import partial
-import sys
-import time
+import struct
 
 from PyQt5.QtWidgets import (
     QApplication,
     QCheckBox,
     QComboBox,
     QDialog,
+    QFileDialog,
     QGridLayout,
     QGroupBox,
     QLabel,
     QLineEdit,
     QMessageBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QWidget,
     QHBoxLayout,
     QVBoxLayout,
@@ -22,21 +21,48 @@ from PyQt5.QtWidgets import (
     QGraphicsView,
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QBrush, QColor
+from PyQt5.QtGui import QFont
 
-import core
-import Board
-import Player
-import Tile
+from . import Board
+from . import Dice
+from . import GameEngine
+from . import PossessionsModel
+from . import Presenter
+from . import Profiler
+from . import Strategy
+
+
+SAVE_FILTER = "Monopoly save (*.mnps)"
+
+
+class HumanStrategy(Strategy.Strategy):
+    """ Decisions asked to the player through the dialogs of the game
+
+    Houses and hotels are bought with the buttons of the interface, the
+    player answers the trade offers of the bots
+    """
+
+    def __init__(self, game):
+        self.game = game
+
+    def decide_buy(self, engine, player, tile):
+        return self.game.ask_buy(tile)
+
+    def decide_mortgage(self, engine, player, amount):
+        return self.game.mortgaging(player, amount)
+
+    def accept_trade(self, engine, player, offer):
+        return self.game.ask_trade(offer)
 
 
 class Monopoly(QWidget):
     """ actual game, display the board and everything 
     
-    Methods for controlling the game
+    Methods for controlling the game, board is the board_data.BoardTables
+    played, core.BOARD when None
     """
 
-    def __init__(self, players, debug = False):
+    def __init__(self, players, debug = False, seed = None, board = None):
         super().__init__()
 
         self.players = list(players.keys())
@@ -44,7 +70,6 @@ class Monopoly(QWidget):
         self.die1 = None
         self.die2 = None
         self.sum_dice = None
-        self.doubles = 0
         self.debug = debug
 
         self.main_layout = QVBoxLayout()
@@ -56,12 +81,22 @@ class Monopoly(QWidget):
         self.message_box = QMessageBox()
         self.ask = QMessageBox()
 
-        if len(self.players) > 1:
-            self.ordered_players = self.order_players()
-        else:
-            self.ordered_players = self.players
+        # events are shown one after the other in this label
+        self.message_label = QLabel()
+        self.message_label.setAlignment(Qt.AlignCenter)
+        self.presenter = Presenter.Presenter(self.message_label)
+
+        human = HumanStrategy(self)
+        self.engine = GameEngine.GameEngine(
+            self.players,
+            {player: human for player in self.players},
+            Dice.Dice(seed),
+            board,
+            log = True,
+        )
 
-        self.player_generator()
+        if len(self.players) > 1:
+            self.order_players()
 
         self.turn_label = QLabel()
         self.balance_info = QLabel()
@@ -69,19 +104,39 @@ class Monopoly(QWidget):
         self.position_info = QLabel()
         self.position = QLabel()
         self.possessions_info = QLabel()
-        self.possessions = QTableWidget()
+        self.possessions = QTableView()
+        self.player2possessions = {
+            player: PossessionsModel.PossessionsModel(self.engine.board) for player in self.players
+        }
         roll_button = QPushButton("Roll")
+        save_button = QPushButton("Save")
+        load_button = QPushButton("Load")
+        speed_box = QComboBox()
+        speed_box.addItems(Presenter.SPEEDS)
+        speed_box.setCurrentText("Normal")
+        fast_forward_button = QPushButton("Fast-forward")
+        fast_forward_button.setCheckable(True)
+
+        # created once, shown when the current player can build
+        self.buy_houses_button = QPushButton("Buy houses")
+        self.buy_hotel_button = QPushButton("Buy hotel")
+        self.buy_houses_button.hide()
+        self.buy_hotel_button.hide()
+
+        for player in self.players:
+            player.add_group_listener(self.group_changed)
 
         self.view = QGraphicsView()
         self.scene = QGraphicsScene()
-        self.board = Board.Board(self.player2color)
+        self.board = Board.Board(self.player2color, self.engine.board)
         self.board.setParent(self)
         self.scene.addItem(self.board)
+        self.board.render_static_layer()
         self.view.setScene(self.scene)
 
         self.possessions.setContentsMargins(0, 0, 50, 50)
 
-        self.pass_player_turn()
+        self.engine.add_listener(self.render_event)
         self.update_interface()
 
         self.turn_layout.addWidget(self.turn_label)
@@ -94,36 +149,45 @@ class Monopoly(QWidget):
         self.player_info_layout.addWidget(self.possessions_info, 1, 2, Qt.AlignCenter)
         self.player_info_layout.addWidget(self.possessions, 2, 2, Qt.AlignCenter)
         self.buttons_layout.addWidget(roll_button)
-        
+        self.buttons_layout.addWidget(self.buy_houses_button)
+        self.buttons_layout.addWidget(self.buy_hotel_button)
+        self.buttons_layout.addWidget(save_button)
+        self.buttons_layout.addWidget(load_button)
+        self.buttons_layout.addWidget(speed_box)
+        self.buttons_layout.addWidget(fast_forward_button)
+
         if debug:
             debug_button = QPushButton("Choose roll")
             self.buttons_layout.addWidget(debug_button)
 
         self.main_layout.addLayout(self.turn_layout)
+        self.main_layout.addWidget(self.message_label)
         self.main_layout.addLayout(self.board_layout)
         self.main_layout.addLayout(self.player_info_layout)
         self.main_layout.addLayout(self.buttons_layout)
 
         self.setLayout(self.main_layout)
 
-        roll_button.clicked.connect(self.play_turn)
+        roll_button.clicked.connect(lambda: self.play_turn())
+        save_button.clicked.connect(self.save_game)
+        load_button.clicked.connect(self.load_game)
+        speed_box.currentTextChanged.connect(
+            lambda text: self.presenter.set_speed(Presenter.SPEEDS[text])
+        )
+        fast_forward_button.toggled.connect(self.presenter.set_fast_forward)
+        self.buy_houses_button.clicked.connect(lambda: self.add_houses_dialog())
+        self.buy_hotel_button.clicked.connect(lambda: self.add_hotel_dialog())
 
         if debug:
             debug_button.clicked.connect(self.debug_roll)
 
-    def player_generator(self):
-        """ Generator for player turns """
-
-        self.gen = (player for player in self.ordered_players)
+    @property
+    def current_player(self):
+        return self.engine.get_current_player()
 
-    def pass_player_turn(self):
-        """ Get next player. Reset generator when over """
-
-        try:
-            self.current_player = next(self.gen)
-        except StopIteration:
-            self.player_generator()
-            self.current_player = next(self.gen)
+    @property
+    def ordered_players(self):
+        return self.engine.ordered_players
 
     def get_current_player(self):
         return self.current_player
@@ -140,58 +204,50 @@ class Monopoly(QWidget):
         self.balance.setText(f"{self.current_player.get_balance()}")
 
     def update_position(self):
-        tile = self.board.get_player_tile(self.current_player)
+        tile = self.engine.get_player_tile(self.current_player)
 
         self.position_info.setText("Current position:")
         self.position.setText(f"{tile.get_name()}")
 
     def update_possessions(self):
-        tiles = self.current_player.get_possessions()
-
-        if tiles:
-            sorted_tiles = sorted(tiles, key = lambda x: x.get_price())
+        """ Show the model of the current player, the models are kept up
+        to date by the purchase and mortgage events
+        """
 
-            self.possessions_info.setText("You have these properties:")
+        model = self.player2possessions[self.current_player]
 
-            if sorted_tiles != []:
-                color2tiles = {}
+        if self.possessions.model() is not model:
+            self.possessions.setModel(model)
 
-                for tile in sorted_tiles:
-                    color2tiles.setdefault(tile.get_color(), []).append(tile)
+        if model.is_empty():
+            self.possessions_info.setText("")
+        else:
+            self.possessions_info.setText("You have these properties:")
 
-                self.possessions.setColumnCount(len(color2tiles))
-                self.possessions.setRowCount(max((len(v) for k, v in color2tiles.items())))
+    def update_buttons(self):
+        """ Show the building buttons the current player can use """
 
-                for column, (color, tiles) in enumerate(color2tiles.items()):
-                    for row, tile in enumerate(tiles):
-                        set_color = QColor()
-                        set_color.setNamedColor(color)
-                        cell = QTableWidgetItem()
-                        cell.setBackground(QBrush(set_color, style = Qt.SolidPattern))
-                        
-                        if color == "#000000":
-                            cell.setForeground(QBrush(QColor(255, 255, 255)))
-                        
-                        cell.setText(f"{tile.get_name()}")
+        if not self.current_player.get_complete_groups():
+            self.buy_houses_button.hide()
+            self.buy_hotel_button.hide()
+            return
 
-                        self.possessions.setItem(row, column, cell)
-        else:
-            self.possessions.clearContents()
+        tile2houses = self.engine.get_buildable_tiles(self.current_player)
 
-    def update_buttons(self, tile2houses):
-        house_eligible_tiles = [tile for tile, nb_houses in tile2houses.items() if nb_houses < 4]
+        self.buy_houses_button.setVisible(
+            any(nb_houses < 4 for nb_houses in tile2houses.values())
+        )
+        self.buy_hotel_button.setVisible(
+            any(nb_houses == 4 for nb_houses in tile2houses.values())
+        )
 
-        if house_eligible_tiles:
-            buy_houses = QPushButton("Buy houses")
-            self.buttons_layout.addWidget(buy_houses)
-            buy_houses.clicked.connect(partial(self.add_houses_dialog, tile2houses))
+    def group_changed(self, player, group, complete):
+        """ A group of player got completed or broken, the building buttons
+        of the current player may change
+        """
 
-        hotel_eligible_tiles = [tile for tile, nb_houses in tile2houses.items() if nb_houses == 4]
-        
-        if hotel_eligible_tiles:
-            buy_hotel = QPushButton("Buy hotel")
-            self.buttons_layout.addWidget(buy_hotel)
-            buy_hotel.clicked.connect(partial(self.add_hotel_dialog, hotel_eligible_tiles))
+        if player is self.current_player:
+            self.update_buttons()
 
     def update_interface(self):
         """ Call all update around the board display methods """
@@ -200,18 +256,12 @@ class Monopoly(QWidget):
         self.update_balance()
         self.update_position()
         self.update_possessions()
+        self.update_buttons()
 
-        group2tiles = self.current_player.has_one_group()
-        tile2houses = {}
-
-        if group2tiles:
-            for tiles in group2tiles.values():
-                for tile in tiles:
-                    tile2houses[tile] = tile.get_nb_houses()
+    def add_houses_dialog(self):
+        self.presenter.flush()
+        tile2houses = self.engine.get_buildable_tiles(self.current_player)
 
-            self.update_buttons(tile2houses)
-
-    def add_houses_dialog(self, tile2houses):
         self.house_window = QDialog()
 
         main_layout = QVBoxLayout()
@@ -247,9 +297,13 @@ class Monopoly(QWidget):
         tile2nb_house_to_add = {}
 
         for row in range(nb_row):
+            # no row for the tiles that already have 4 houses
+            if gridlayout.itemAtPosition(row, 0) is None:
+                continue
+
             nb_house_to_add = int(gridlayout.itemAtPosition(row, 0).widget().currentText())
             tile_name = gridlayout.itemAtPosition(row, 1).widget().text()
-            tile = self.board.get_tile(tile_name)
+            tile = self.engine.get_tile(tile_name)
 
             tile2nb_house_to_add[tile] = nb_house_to_add
             total_price += tile.get_house_price() * nb_house_to_add
@@ -257,17 +311,20 @@ class Monopoly(QWidget):
         if all(value == 0 for value in tile2nb_house_to_add.values()):
             self.popup("You didn't pick any houses to add")
 
-        if total_price <= self.current_player.get_balance():
-            for tile, nb_houses in tile2nb_house_to_add.items():
-                tile.add_houses(nb_houses)
-                tile.display_houses()
-
+        if self.engine.build_houses(self.current_player, tile2nb_house_to_add):
             self.house_window.done(0)
-        
+            self.presenter.flush()
+            self.update_interface()
         else:
             self.popup("You don't have enough money to pay")
             
-    def add_hotel_dialog(self, hotel_eligible_tiles):
+    def add_hotel_dialog(self):
+        self.presenter.flush()
+        hotel_eligible_tiles = [
+            tile for tile, nb_houses in self.engine.get_buildable_tiles(self.current_player).items()
+            if nb_houses == 4
+        ]
+
         self.hotel_window = QDialog()
 
         main_layout = QVBoxLayout()
@@ -300,40 +357,28 @@ class Monopoly(QWidget):
         for box in boxes:
             if box.checkState() == 2:
                 tile_name = box.text()
-                tile = self.board.get_tile(tile_name)
+                tile = self.engine.get_tile(tile_name)
                 hotel_price += tile.get_house_price()
                 hotels_to_add.append(tile)
 
-        if hotel_price <= self.current_player.get_balance():
-            for tile in hotels_to_add:
-                tile.add_hotel()
+        if self.engine.build_hotel(self.current_player, hotels_to_add):
             self.hotel_window.done(0)
+            self.presenter.flush()
+            self.update_interface()
         else:
             self.popup("You don't have enough money to buy those hotels")
 
     def order_players(self):
-        """ roll dices for players and order them
-        
-        Returns: ordered players (list of Player)
-        """
-
-        rolls = []
-
-        for player in self.players:
-            rolls.append(sum(core.roll()[0:2]))
+        """ roll dices for players and order them, show the result """
 
-        rolls_players = sorted(set(zip(rolls, self.players)), key=lambda x: -x[0])
-        ordered_players = [player for roll, player in rolls_players]
+        rolls_players = self.engine.order_players()
 
         message = "Order of players:\n"
 
         for roll, player in rolls_players:
             message += f"- {player} rolled {roll}\n"
 
-        self.message_box.setText(message)
-        self.message_box.exec_()
-
-        return ordered_players
+        self.presenter.add(message)
 
     def popup(self, message):
         """ Popup QMessageBox with param message 
@@ -345,98 +390,203 @@ class Monopoly(QWidget):
         self.message_box.setText(message)
         self.message_box.exec_()
 
-    def update_token_position(self, current_tile, new_tile, message):
-        """ Update the token position on the board 
-        
-        Remove from current tile
-        Add to new tile
-        Call display method
+    def update_token_position(self, player, new_tile, message):
+        """ Queue the move of the token on the board
+
+        The token slides from its tile to new_tile when the step is shown
 
         Args:
-            current_tile: Tile
+            player: Player
             new_tile: Tile
             message: str
         """
 
-        # add/remove token from new/current tile
-        current_player_token = current_tile.get_token(self.current_player)
-        current_tile.remove_token(current_player_token)
-        new_tile.add_token(current_player_token)
+        self.presenter.add(message, lambda: self.board.slide_token(player, new_tile))
 
-        # remove token from layout
-        current_tile.remove_token_layout(current_player_token)
+    def play_turn(self, debug = False):
+        """ Play the turn through the engine
 
-        # add token in layout
-        new_tile.display_game_pieces()
+        The engine rolls, moves, interacts with the board and passes
+        the turn, the events are rendered as they happen
 
-        # change token's tile
-        current_player_token.set_tile(new_tile)
+        Args:
+            debug: bool, use the die values typed in the debug window
+        """
 
-        time.sleep(0.5)
+        if debug:
+            if not all((self.die1, self.die2, self.sum_dice)):
+                return
 
-        self.popup(message)
+            self.engine.play_turn((self.die1, self.die2))
+        else:
+            self.engine.play_turn()
 
-    def play_turn(self, debug = False):
-        """ Play the turn 
-        
-        Roll dice
-        Move player
-        Interact with the board
-        Update interface
+        self.presenter.add(action = self.update_interface)
+
+        if self.engine.is_over():
+            self.presenter.add(action = lambda: self.end_game(self.engine.winner))
+
+    def render_event(self, event):
+        """ Queue the display of an event coming from the engine
 
         Args:
-            debug: bool
+            event (GameEngine.Event)
         """
 
-        if not debug:
-            self.roll()
+        kind, player, data = event
 
-        if not all((self.die1, self.die2, self.sum_dice)):
-            return
+        if kind == "roll":
+            self.die1, self.die2, self.sum_dice = data["die1"], data["die2"], data["total"]
+            self.presenter.add(f"{player} rolled {self.die1} and {self.die2}: {self.sum_dice}")
 
-        if self.current_player.in_jail():
-            if self.die1 == self.die2:
-                self.current_player.out_of_jail()
-                self.popup("You're out of prison")
-            else:
-                self.current_player.pass_turn()
-                
-                if self.current_player.in_jail() == 0:
-                    self.popup("You're out of prison")
-                else:
-                    self.popup(
-                        f"You have {self.current_player.in_jail()} turns left in jail"
-                    )
-
-            self.pass_player_turn()
-            self.update_interface()
+        elif kind == "jail_release":
+            self.presenter.add("You're out of prison")
 
-        else:
-            current_tile, passed_start = self.move_player()
-            self.interact_board(current_tile, passed_start)
-
-            if self.die1 == self.die2:
-                self.doubles += 1
-
-                if self.doubles == 3:
-                    self.send_player_to_jail()
-                    self.pass_player_turn()
-                    self.update_interface()
-                else:
-                    self.update_interface()
+        elif kind == "jail_wait":
+            self.presenter.add(f"You have {data['turns_left']} turns left in jail")
+
+        elif kind == "move":
+            new_tile = self.board.get_tile(tile_pos = data["end"])
+            self.update_token_position(
+                player, new_tile, f"You landed on {new_tile.get_name()}"
+            )
+
+        elif kind == "jail":
+            self.update_token_position(
+                player, self.board.get_tile(tile_pos = data["end"]), "You got sent to jail"
+            )
+
+        elif kind == "salary":
+            self.presenter.add(f"You earned {data['amount']} from the Start tile")
+
+        elif kind == "rent":
+            owner = data["owner"]
+            message = f"""
+                You have landed on {owner}'s property
+                You have to pay {data['amount']}:
+                 - {player} now have {player.get_balance()}
+                 - {owner} now have {owner.get_balance()}
+            """
+            self.presenter.add(message)
+
+        elif kind == "cannot_afford":
+            tile_name = data["tile"].get_name()
+            self.presenter.add(f"You don't have enough money to buy {tile_name} ({data['price']})")
+
+        elif kind == "purchase":
+            self.presenter.add(
+                f"You now have {data['tile'].get_name()} and {player.get_balance()}",
+                partial(self.add_possession, player, data["tile"])
+            )
+
+        elif kind == "tax":
+            self.presenter.add(f"You pay {data['amount']} for landing on {data['tile'].get_name()}")
+
+        elif kind == "free_parking":
+            self.presenter.add(f"You receive {data['amount']} for landing on Free Parking")
+
+        elif kind == "mortgage":
+            self.presenter.add(action = partial(self.remove_possession, player, data["tile"]))
+
+        elif kind == "build":
+            tile = self.board.get_tile(data["tile"].get_name())
+
+            if data["houses"] == 5:
+                self.presenter.add(action = tile.add_hotel)
             else:
-                self.doubles = 0
-                self.pass_player_turn()
-                self.update_interface()
+                self.presenter.add(action = partial(tile.set_development, data["houses"], False))
+
+        elif kind == "card":
+            deck = "Chance" if data["deck"] == "chance" else "Community Chest"
+            self.presenter.add(f"{deck}: {data['text']}")
+
+        elif kind == "card_payment":
+            self.presenter.add(f"You pay {data['amount']}")
+
+        elif kind == "card_income":
+            self.presenter.add(f"You receive {data['amount']}")
+
+        elif kind == "card_transfer":
+            self.presenter.add(f"{player} pays {data['amount']} to {data['receiver']}")
+
+        elif kind == "jail_card":
+            self.presenter.add("You use your Get out of jail card")
+
+        elif kind == "trade":
+            receiver = data["receiver"]
+            message = f"{player} traded with {receiver}"
+
+            for owner, tiles in ((receiver, data["give"]), (player, data["take"])):
+                if tiles:
+                    names = ", ".join(tile.get_name() for tile in tiles)
+                    message += f"\n - {owner} now has {names}"
+
+            if data["amount"]:
+                message += f"\n - {player} paid {data['amount']} to {receiver}"
+
+            self.presenter.add(message, partial(self.exchange_possessions, player, data))
+
+        elif kind == "elimination":
+            self.presenter.add(f"{player} lost", partial(self.player_lost, player))
+
+    def add_possession(self, player, engine_tile):
+        self.board.get_tile(engine_tile.get_name()).set_owner(player)
+        self.player2possessions[player].add_tile(engine_tile)
+
+    def remove_possession(self, player, engine_tile):
+        self.board.get_tile(engine_tile.get_name()).remove_owner()
+        self.player2possessions[player].remove_tile(engine_tile)
 
-        if len(self.ordered_players) == 1:
-            self.end_game(self.ordered_players[0])
+    def exchange_possessions(self, player, data):
+        """ Owners and possessions after a trade event """
 
-    def roll(self):
-        """ roll and get new position """
+        receiver = data["receiver"]
 
-        self.die1, self.die2, self.sum_dice = core.roll()
-        self.popup(f"{self.current_player} rolled {self.die1} and {self.die2}: {self.sum_dice}")
+        for old, new, tiles in ((player, receiver, data["give"]), (receiver, player, data["take"])):
+            for engine_tile in tiles:
+                self.board.get_tile(engine_tile.get_name()).set_owner(new)
+                self.player2possessions[old].remove_tile(engine_tile)
+                self.player2possessions[new].add_tile(engine_tile)
+
+    def ask_trade(self, offer):
+        """ Trade decision of the player, asked with a QMessageBox
+
+        Returns: bool
+        """
+
+        self.presenter.flush()
+        give = ", ".join(tile.get_name() for tile in offer.give) or "nothing"
+        take = ", ".join(tile.get_name() for tile in offer.take) or "nothing"
+
+        if offer.cash > 0:
+            give += f" and {offer.cash}"
+        elif offer.cash < 0:
+            take += f" and {-offer.cash}"
+
+        answer = self.ask.question(
+            self,
+            "",
+            f"{offer.proposer} offers {give} to {offer.receiver} for {take}, accept?",
+            self.ask.Yes | self.ask.No
+        )
+
+        return answer == self.ask.Yes
+
+    def ask_buy(self, tile):
+        """ Buy decision of the player, asked with a QMessageBox
+
+        Returns: bool
+        """
+
+        self.presenter.flush()
+        buy = self.ask.question(
+            self,
+            "",
+            f"Buy {tile.get_name()} for {tile.get_price()}?",
+            self.ask.Yes | self.ask.No
+        )
+
+        return buy == self.ask.Yes
 
     def debug_roll(self):
         """ Window to choose which value you get for rolling
@@ -476,182 +626,19 @@ class Monopoly(QWidget):
         self.debug_window.done(0)
         self.play_turn(debug = True)
 
-    def move_player(self):
-        """ Move player on the board
+    def mortgaging(self, player, amount):
+        """ Propose all player properties for mortgaging (checkboxes)
 
-        Get new position --> new tile
-        Remove player from old tile
-        Add player to new tile
+        Mortgage decision of the player
 
-        Returns:
-            new_tile (Tile object)
-            bool
+        Returns: tiles to mortgage (list of GameEngine.EngineTile)
         """
-        
-        passed_start = False
-
-        # get the new tile according to the position of current player
-        current_tile = self.board.get_player_tile(self.current_player)
-        current_board_pos = current_tile.get_board_pos()
-        new_board_pos = current_board_pos + self.sum_dice
-
-        # if player gets passed last position of the board
-        # "reset" the number to loop through the board
-        if new_board_pos >= 40:
-            new_board_pos -= 40
-            passed_start = True
-
-        # use the fake position to get the new tile
-        new_tile = self.board.get_tile(tile_pos = new_board_pos)
-
-        self.update_token_position(
-            current_tile,
-            new_tile,
-            f"You landed on {new_tile.get_name()}"
-        )
-
-        return new_tile, passed_start
-
-    def send_player_to_jail(self):
-        """ Send the current player to jail """
-
-        current_tile = self.board.get_player_tile(self.current_player)
-        jail_tile = self.board.get_tile(tile_name = "Visit Jail")
-        
-        self.update_token_position(
-            current_tile,
-            jail_tile,
-            "You got sent to jail"
-        )
 
-        self.current_player.go_to_jail()
-
-    def interact_board(self, tile, passed_start):
-        """ Interaction with the board
-
-        Buy properties, pay rent, pay taxes...
-
-        Args:
-            tile (Tile)
-            passed_start (bool)
-        """
-
-        tile_name = tile.get_name()
-        tile_board_pos = tile.get_board_pos()
-
-        # Check that player didn't landed on Start or Jail before giving start money
-        if passed_start and tile_name not in ["Start", "Go to Jail"]:
-            start_tile = self.board.get_tile("Start")
-            start_money = start_tile.get_price()
-            self.current_player.receive(start_money)
-            message = f"You earned {start_money} after passing through the Start tile"
-            self.popup(message)
-
-        if tile_board_pos in core.PROPERTIES:
-            if tile.is_owned():
-                owner = tile.get_owner()
-
-                if owner != self.current_player:
-                    rent = tile.get_rent()
-
-                    if self.current_player.get_balance() >= rent:
-                        new_balance = self.current_player.pay(rent)
-                        owner_balance = owner.receive(rent)
-                        message = f"""
-                            You have landed on {owner}'s property
-                            You have to pay {rent}:
-                             - {self.current_player} now have {new_balance}
-                             - {owner} now have {owner_balance}
-                        """
-                        self.popup(message)
-                    else:
-                        self.sum_to_pay = rent
-                        bankrupt = self.player_bankrupt()
-
-                        if bankrupt:
-                            self.player_lost()
-                        else:
-                            self.mortgaging()
-
-            else:
-                price = tile.get_price()
-                player_balance = self.current_player.get_balance()
-
-                if player_balance < price:
-                    message = f"You don't have enough money to buy {tile_name} ({price})"
-                    self.popup(message)
-                else:    
-                    buy = self.ask.question(
-                        self,
-                        "",
-                        f"Buy {tile_name} for {price}?",
-                        self.ask.Yes | self.ask.No
-                    )
-                    self.ask.exec_()
-                    
-                    if buy == self.ask.Yes:
-                        self.current_player.add_possession(tile)
-                        tile.set_owner(self.current_player)
-                        message = f"You now have {tile_name} and {self.current_player.get_balance()}"
-                        self.popup(message)
-        
-        elif tile_board_pos in core.SPECIAL_CASES:
-            tile_value = tile.get_price()
-            suffix_message = f"for landing on {tile_name}"
-            
-            if tile_name == "Start":
-                self.current_player.receive(tile_value * 2)
-                message = f"You receive {tile_value * 2} {suffix_message}"
-                self.popup(message)
-
-            elif tile_name in ["Income Tax", "Super Tax"]:
-                if self.current_player.get_balance() >= tile_value:
-                    self.current_player.pay(tile_value)
-                    self.board.free_parking += tile_value
-                    message = f"You pay {tile_value} {suffix_message}"
-                    self.popup(message)
-                else:
-                    self.sum_to_pay = tile_value
-                    bankrupt = self.player_bankrupt()
-                    
-                    if bankrupt:
-                        self.player_lost()
-                    else:
-                        self.mortgaging()
-
-            elif tile_name == "Go to Jail":
-                self.send_player_to_jail()
-
-            elif tile_name == "Free Parking":
-                self.current_player.receive(self.board.free_parking)
-                message = f"You receive {self.board.free_parking} {suffix_message}"
-                self.board.free_parking = 0
-                self.popup(message)
-
-        elif tile_name == "Chance" or tile_name == "Community Chest":
-            pass
-
-    def player_bankrupt(self):
-        """ Check for player's real estate to see if bankrupt 
-        
-        Returns: bool
-        """
-        
-        real_estate = 0
-        player_properties = self.current_player.get_possessions()
-
-        for tile in player_properties:
-            real_estate += tile.get_mortgage()
-
-        if real_estate < self.sum_to_pay:
-            return True
-        else:
-            return False
-
-    def mortgaging(self):
-        """ Propose all player properties for mortgaging (checkboxes) """
-        
-        properties = self.current_player.get_possessions()
+        self.presenter.flush()
+        properties = player.get_possessions()
+        self.sum_to_pay = amount - player.get_balance()
+        self.chosen_mortgage = []
+        self.box2tile = {}
 
         self.mortgaging_window = QDialog()
 
@@ -663,8 +650,9 @@ class Monopoly(QWidget):
         button = QPushButton("Mortgage")
 
         for prop in properties:
-            box = QCheckBox(f"{prop.get_name()}-{prop.get_mortgage()}")
+            box = QCheckBox(f"{prop.get_name()}: {prop.get_mortgage()}")
             groupbox_layout.addWidget(box)
+            self.box2tile[box] = prop
 
         button_layout.addWidget(button)
         self.mortgage_options.setLayout(groupbox_layout)
@@ -678,28 +666,22 @@ class Monopoly(QWidget):
 
         self.mortgaging_window.exec_()
 
+        return self.chosen_mortgage
+
     def mortgage_clicked(self):
         """
         Get the properties selected for mortgage
         Check if the sum is enough to pay the sum due
-        Remove the properties from the player
+        Hand them to the engine which removes them from the player
         """
 
-        boxes = self.mortgage_options.findChildren(QCheckBox)
-        mortgage_money = 0
-        chosen_mortgaged_properties = []
-
-        for box in boxes:
-            if box.checkState() == 2:
-                name, mortgage_worth = box.text().split("-")
-                mortgage_money += int(float(mortgage_worth))
-                chosen_mortgaged_properties.append(name)
+        chosen_mortgaged_properties = [
+            tile for box, tile in self.box2tile.items() if box.isChecked()
+        ]
+        mortgage_money = sum(tile.get_mortgage() for tile in chosen_mortgaged_properties)
 
         if mortgage_money >= self.sum_to_pay:
-            for name in chosen_mortgaged_properties:
-                tile = self.board.get_tile(name)
-                self.current_player.remove_possession(tile)
-                tile.remove_owner()
+            self.chosen_mortgage = chosen_mortgaged_properties
             self.mortgaging_window.done(0)
         else:
             message = f"""
@@ -708,15 +690,79 @@ class Monopoly(QWidget):
             """
             self.popup(message)
 
-    def player_lost(self):
-        """ Remove the player from the game """
+    def save_game(self):
+        """ Write a snapshot of the engine in the file chosen by the player """
+
+        self.presenter.flush()
 
-        self.popup(f"{self.current_player} lost")
-        self.ordered_players.remove(self.current_player)
-        tile = self.board.get_player_tile(self.current_player)
-        token = tile.get_token(self.current_player)
-        tile.remove_token(token)
-        tile.remove_token_layout(token)
+        path, _ = QFileDialog.getSaveFileName(self, "Save game", "", SAVE_FILTER)
+
+        if path:
+            with open(path, "wb") as save_file:
+                save_file.write(self.engine.snapshot())
+
+    def load_game(self):
+        """ Restore a snapshot in the engine and resync the board """
+
+        self.presenter.flush()
+
+        path, _ = QFileDialog.getOpenFileName(self, "Load game", "", SAVE_FILTER)
+
+        if not path:
+            return
+
+        with open(path, "rb") as save_file:
+            data = save_file.read()
+
+        try:
+            self.engine.restore(data)
+        except (ValueError, struct.error) as error:
+            self.popup(f"Can't load {path}: {error}")
+            return
+
+        self.sync_board()
+        self.update_interface()
+
+    def sync_board(self):
+        """ Owners, houses and tokens of the board from the engine, the
+        scene is kept and only the items that changed are updated
+        """
+
+        for engine_tile in self.engine.tiles:
+            tile = self.board.get_tile(tile_pos = engine_tile.get_board_pos())
+
+            if engine_tile.is_owned():
+                tile.set_owner(engine_tile.get_owner())
+            else:
+                tile.remove_owner()
+
+            if engine_tile.get_house_price() is not None and (
+                tile.get_nb_houses() != engine_tile.get_nb_houses()
+                or tile.hotel != engine_tile.has_hotel()
+            ):
+                tile.set_development(engine_tile.get_nb_houses(), engine_tile.has_hotel())
+
+        for player in self.players:
+            self.player2possessions[player].set_tiles(player.get_possessions())
+
+            if player in self.engine.ordered_players:
+                board_pos = self.engine.get_position(player)
+
+                if self.board.get_player_tile(player) is not self.board.get_tile(tile_pos = board_pos):
+                    self.board.place_token(player, self.board.get_tile(tile_pos = board_pos))
+
+            elif self.board.get_player_tile(player) is not None:
+                self.board.remove_token(player)
+
+    def player_lost(self, player):
+        """ Remove the token and the properties of a player out of the game """
+
+        for tile in self.board.pos2tile:
+            if tile.get_owner() == player:
+                tile.remove_owner()
+
+        self.player2possessions[player].set_tiles([])
+        self.board.remove_token(player)
 
     def end_game(self, winner):
         """ Open a QDialog to ask if the players want to restart 
@@ -752,14 +798,35 @@ class Monopoly(QWidget):
         self.end_window.exec_()
 
     def restart(self):
-        """ Send reboot exit code to the main event loop """
-        QApplication.exit(self.parent().parent().EXIT_CODE_REBOOT)
+        """ Close the end of game dialog and play again """
+
+        self.end_window.done(0)
+        self.new_game()
+
+    def new_game(self):
+        """ Start again with the same players on the same board
+
+        The engine is reset and the board, tokens and possessions are
+        synced back from it, no widget is rebuilt
+        """
+
+        self.presenter.clear()
+        self.engine.reset()
+        self.sync_board()
+
+        if len(self.players) > 1:
+            self.order_players()
+
+        self.update_interface()
 
     def exit_game(self):
         """ Send exit code to the main event loop """
         QApplication.exit(-1)
 
 
+Profiler.register(Monopoly, ["play_turn", "update_token_position", "update_interface"])
+
+
 def main():
     pass
 
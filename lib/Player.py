@@ -1,13 +1,23 @@
 from collections import defaultdict
 
 class Player:
+    __slots__ = (
+        "name", "balance", "possessions", "group_possessions", "jail_status",
+        "group2tiles", "complete_groups", "group_listeners",
+    )
+
     def __init__(self, name):
         self.name = name
         self.balance = 1500
         self.possessions = []
-        self.group_possessions = defaultdict(lambda: 0)
+        self.group_possessions = defaultdict(int)
         self.jail_status = 0
 
+        # kept up to date by add/remove so nothing has to be recounted
+        self.group2tiles = defaultdict(list)
+        self.complete_groups = set()
+        self.group_listeners = []
+
     def __str__(self):
         return self.name
 
@@ -25,24 +35,76 @@ class Player:
 
     def add_possession(self, tile):
         self.balance -= tile.get_price()
+        self.take_possession(tile)
+
+    def take_possession(self, tile):
+        """ Add the property without paying for it """
+
+        group = tile.get_group()
         self.possessions.append(tile)
-        self.group_possessions[tile.get_group()] += 1
+        self.group_possessions[group] += 1
+        self.group2tiles[group].append(tile)
+
+        if self.group_possessions[group] == tile.get_number_in_group():
+            self.complete_groups.add(group)
+            self.notify_group(group, True)
 
     def remove_possession(self, tile):
         self.balance += tile.get_mortgage()
+        self.give_up_possession(tile)
+
+    def give_up_possession(self, tile):
+        """ Remove the property without any money exchange """
+
+        group = tile.get_group()
         self.possessions.remove(tile)
-        self.group_possessions[tile.get_group()] -= 1
+        self.group_possessions[group] -= 1
+        self.group2tiles[group].remove(tile)
 
-    def has_one_group(self):
-        group2tiles = {}
+        if group in self.complete_groups:
+            self.complete_groups.discard(group)
+            self.notify_group(group, False)
+
+    def release_possessions(self):
+        """ Drop all the properties without any money exchange """
 
-        for prop in self.possessions:
-            group = prop.get_group()
+        lost_groups = list(self.complete_groups)
+
+        self.possessions = []
+        self.group_possessions.clear()
+        self.group2tiles.clear()
+        self.complete_groups.clear()
+
+        for group in lost_groups:
+            self.notify_group(group, False)
+
+    def add_group_listener(self, listener):
+        """ Call listener(player, group, complete) when a group gets
+        completed or broken
+        """
+        self.group_listeners.append(listener)
+
+    def notify_group(self, group, complete):
+        for listener in self.group_listeners:
+            listener(self, group, complete)
+
+    def get_complete_groups(self):
+        return self.complete_groups
+
+    def has_complete_group(self, group):
+        return group in self.complete_groups
+
+    def has_one_group(self):
+        """ Tiles of the complete groups
 
-            if prop.get_number_in_group() == self.group_possessions[group]:
-                group2tiles.setdefault(group, []).append(prop)
+        Returns: dict of group name: list of tiles
+        """
 
-        return group2tiles
+        # iterate the dict, not the set, so the order doesn't depend on str hashes
+        return {
+            group: tiles for group, tiles in self.group2tiles.items()
+            if group in self.complete_groups
+        }
 
     def pay(self, amount):
         self.balance -= amount
@@ -0,0 +1,165 @@
+""" Table of the properties of one player
+
+One column per color group, the tiles of the group sorted by price in
+the rows. The model is updated tile by tile when the player buys or
+loses a property and only signals the cells that changed, the view
+just switches models when the turn changes.
+"""
+
+from bisect import bisect
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor
+
+from . import core
+
+
+WHITE = "#ffffff"
+
+
+class PossessionsModel(QAbstractTableModel):
+    """ Properties of a player grouped by color
+
+    Args:
+        board (board_data.BoardTables): board of the tiles, core.BOARD when None
+    """
+
+    color2brush = {}
+
+    def __init__(self, board = None):
+        super().__init__()
+        # columns in the order of the groups on the board
+        self.color2order = (board or core.BOARD).color2group
+        self.columns = []
+        self.nb_rows = 0
+
+    @classmethod
+    def brush(cls, color):
+        """ One brush per color for the whole game """
+
+        if color not in cls.color2brush:
+            cls.color2brush[color] = QBrush(QColor(color), Qt.SolidPattern)
+
+        return cls.color2brush[color]
+
+    def rowCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else self.nb_rows
+
+    def columnCount(self, parent = QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def get_tile(self, row, column):
+        tiles = self.columns[column][1]
+
+        if row < len(tiles):
+            return tiles[row]
+
+    def data(self, index, role = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        tile = self.get_tile(index.row(), index.column())
+
+        if tile is None:
+            return None
+
+        if role == Qt.DisplayRole:
+            return tile.get_name()
+
+        if role == Qt.BackgroundRole:
+            return self.brush(tile.get_color())
+
+        if role == Qt.ForegroundRole and tile.get_color() == "#000000":
+            return self.brush(WHITE)
+
+        return None
+
+    def column_of(self, color):
+        """ Index of the column of color, or where it would be inserted
+
+        Returns:
+            (column, exists)
+        """
+
+        order = self.color2order[color]
+
+        for column, (column_color, tiles) in enumerate(self.columns):
+            if column_color == color:
+                return column, True
+
+            if self.color2order[column_color] > order:
+                return column, False
+
+        return len(self.columns), False
+
+    def add_tile(self, tile):
+        column, exists = self.column_of(tile.get_color())
+
+        if not exists:
+            self.beginInsertColumns(QModelIndex(), column, column)
+            self.columns.insert(column, (tile.get_color(), []))
+            self.endInsertColumns()
+
+        tiles = self.columns[column][1]
+        keys = [(other.get_price(), other.get_board_pos()) for other in tiles]
+        row = bisect(keys, (tile.get_price(), tile.get_board_pos()))
+
+        # an empty row at the bottom first, then the cells below the tile move down
+        if len(tiles) == self.nb_rows:
+            self.beginInsertRows(QModelIndex(), self.nb_rows, self.nb_rows)
+            self.nb_rows += 1
+            self.endInsertRows()
+
+        tiles.insert(row, tile)
+        self.dataChanged.emit(self.index(row, column), self.index(len(tiles) - 1, column))
+
+    def remove_tile(self, tile):
+        column, exists = self.column_of(tile.get_color())
+
+        if not exists or tile not in self.columns[column][1]:
+            return
+
+        tiles = self.columns[column][1]
+        row = tiles.index(tile)
+        tiles.pop(row)
+        self.dataChanged.emit(self.index(row, column), self.index(len(tiles), column))
+
+        if not tiles:
+            self.beginRemoveColumns(QModelIndex(), column, column)
+            self.columns.pop(column)
+            self.endRemoveColumns()
+
+        nb_rows = max((len(tiles) for color, tiles in self.columns), default = 0)
+
+        if nb_rows < self.nb_rows:
+            self.beginRemoveRows(QModelIndex(), nb_rows, self.nb_rows - 1)
+            self.nb_rows = nb_rows
+            self.endRemoveRows()
+
+    def set_tiles(self, tiles):
+        """ Replace all the tiles, after a load or an elimination """
+
+        self.beginResetModel()
+        self.columns = []
+        self.nb_rows = 0
+
+        for tile in sorted(tiles, key = lambda x: (x.get_price(), x.get_board_pos())):
+            column, exists = self.column_of(tile.get_color())
+
+            if not exists:
+                self.columns.insert(column, (tile.get_color(), []))
+
+            self.columns[column][1].append(tile)
+
+        self.nb_rows = max((len(tiles) for color, tiles in self.columns), default = 0)
+        self.endResetModel()
+
+    def is_empty(self):
+        return not self.columns
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
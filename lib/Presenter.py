@@ -0,0 +1,140 @@
+""" Queued presentation of the game events
+
+The engine plays a whole turn at once. Instead of blocking the event loop
+with sleeps and modal popups, what the players should see is queued as
+steps and a QTimer shows them one after the other: tokens slide with a
+QPropertyAnimation and the messages go in a label. The delay between two
+steps is divided by the speed, fast-forward shows every step as soon as
+it is added.
+"""
+
+from collections import deque
+
+from PyQt5.QtCore import QAbstractAnimation, QObject, QTimer
+
+from . import Profiler
+
+
+STEP_MS = 700
+# share of the delay of a step taken by its animation
+ANIMATION_SHARE = 0.6
+SPEEDS = {"Slow": 0.5, "Normal": 1, "Fast": 3}
+
+
+class Presenter(QObject):
+    """ Steps shown one by one without blocking
+
+    Args:
+        label (QLabel): shows the message of the current step
+        speed (float): the delays are divided by speed
+    """
+
+    def __init__(self, label, speed = 1):
+        super().__init__()
+        self.label = label
+        self.speed = speed
+        self.fast_forward = False
+        self.steps = deque()
+        self.animations = []
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.next_step)
+
+    def get_delay(self):
+        return int(STEP_MS / self.speed)
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def set_fast_forward(self, fast_forward):
+        self.fast_forward = fast_forward
+
+        if fast_forward:
+            self.flush()
+
+    def is_idle(self):
+        return not self.steps and not self.timer.isActive()
+
+    def add(self, message = None, action = None):
+        """ Queue a step, shown right away when nothing else is
+
+        Args:
+            message (str): shown in the label, None keeps the last one
+            action (callable): changes the display, can return a
+                QPropertyAnimation set to its start which is then run
+        """
+
+        if self.fast_forward:
+            self.show_step(message, action, instant = True)
+        elif self.is_idle():
+            self.show_step(message, action)
+            self.timer.start(self.get_delay())
+        else:
+            self.steps.append((message, action))
+
+    def next_step(self):
+        if not self.steps:
+            return
+
+        self.show_step(*self.steps.popleft())
+        self.timer.start(self.get_delay())
+
+    def show_step(self, message, action, instant = False):
+        if action is not None:
+            animation = action()
+
+            if animation is not None:
+                self.run_animation(animation, instant)
+
+        if message is not None:
+            self.label.setText(message.strip())
+
+    def run_animation(self, animation, instant):
+        if instant:
+            animation.setDuration(0)
+            animation.start(QAbstractAnimation.DeleteWhenStopped)
+            return
+
+        animation.setDuration(int(self.get_delay() * ANIMATION_SHARE))
+        self.animations.append(animation)
+
+        # also stopped without finishing by a newer animation of the same token
+        def forget(state):
+            if state == QAbstractAnimation.Stopped:
+                self.animations.remove(animation)
+
+        animation.stateChanged.connect(forget)
+        animation.start(QAbstractAnimation.DeleteWhenStopped)
+
+    def finish_animations(self):
+        for animation in list(self.animations):
+            animation.setCurrentTime(animation.totalDuration())
+
+    def flush(self):
+        """ Show everything queued at once, before a decision of a player
+        or anything reading the board
+        """
+
+        self.timer.stop()
+        self.finish_animations()
+
+        while self.steps:
+            self.show_step(*self.steps.popleft(), instant = True)
+
+    def clear(self):
+        """ Drop the steps not shown yet, the game they show is over """
+
+        self.timer.stop()
+        self.finish_animations()
+        self.steps.clear()
+
+
+Profiler.register(Presenter, ["show_step", "flush"])
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
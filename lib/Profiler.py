@@ -0,0 +1,172 @@
+""" Opt-in timing of the phases of a turn
+
+Modules register the methods that make a phase of the turn with
+register(). Nothing is wrapped until the profiler is enabled, so the
+hooks cost nothing at all when profiling is off. Once enabled every call
+of a registered method becomes a span kept in a ring buffer, which can
+be dumped as a Chrome trace (chrome://tracing, Perfetto) or as collapsed
+stacks for flamegraph.pl / speedscope.
+"""
+
+from collections import Counter, deque
+import functools
+import time
+
+
+class Profiler:
+    """ Ring buffer of spans
+
+    Args:
+        capacity (int): spans kept, the oldest are dropped first
+    """
+
+    def __init__(self, capacity = 100000):
+        self.enabled = False
+        self.spans = deque(maxlen = capacity)
+        self.calls = Counter()
+        self.stack = []
+        self.hooks = []
+        self.originals = {}
+
+    def register(self, owner, names):
+        """ Make methods of a class phases of the profile
+
+        Args:
+            owner (class)
+            names (list of str): methods, spans are named Class.method
+        """
+
+        for name in names:
+            self.hooks.append((owner, name))
+
+            if self.enabled:
+                self.wrap(owner, name)
+
+    def wrap(self, owner, name):
+        function = owner.__dict__[name]
+        self.originals[owner, name] = function
+        span_name = f"{owner.__name__}.{name}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self.begin(span_name)
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.end()
+
+        setattr(owner, name, wrapper)
+
+    def enable(self):
+        if self.enabled:
+            return
+
+        self.enabled = True
+
+        for owner, name in self.hooks:
+            self.wrap(owner, name)
+
+    def disable(self):
+        """ Put the original methods back, the spans are kept """
+
+        for (owner, name), function in self.originals.items():
+            setattr(owner, name, function)
+
+        self.originals.clear()
+        self.stack.clear()
+        self.enabled = False
+
+    def clear(self):
+        self.spans.clear()
+        self.calls.clear()
+
+    def begin(self, name):
+        self.stack.append([name, time.perf_counter_ns(), 0])
+
+    def end(self):
+        end = time.perf_counter_ns()
+        name, start, children = self.stack.pop()
+        duration = end - start
+
+        if self.stack:
+            self.stack[-1][2] += duration
+            path = ";".join(frame[0] for frame in self.stack) + ";" + name
+        else:
+            path = name
+
+        self.calls[name] += 1
+        self.spans.append((path, start, duration, duration - children))
+
+    def chrome_trace(self):
+        """ Spans as complete events and call counts as counter events
+
+        Returns:
+            dict in the Chrome trace event format
+        """
+
+        events = []
+        origin = min((start for path, start, duration, self_time in self.spans), default = 0)
+
+        for path, start, duration, self_time in self.spans:
+            events.append({
+                "name": path.rsplit(";", 1)[-1],
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": duration / 1000,
+                "pid": 0,
+                "tid": 0,
+                "args": {"stack": path},
+            })
+
+        if self.spans:
+            path, start, duration, self_time = self.spans[-1]
+            events.append({
+                "name": "calls",
+                "ph": "C",
+                "ts": (start + duration - origin) / 1000,
+                "pid": 0,
+                "args": dict(self.calls),
+            })
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def collapsed_stacks(self):
+        """ Self time in microseconds of every stack
+
+        Returns:
+            list of str, "phase;subphase time" lines
+        """
+
+        path2time = Counter()
+
+        for path, start, duration, self_time in self.spans:
+            path2time[path] += self_time
+
+        return [f"{path} {self_time // 1000}" for path, self_time in sorted(path2time.items())]
+
+    def dump(self, path):
+        """ Chrome trace when path ends with .json, collapsed stacks otherwise """
+
+        # only needed here, every module of the engine imports the profiler
+        import json
+
+        with open(path, "w") as dump_file:
+            if path.endswith(".json"):
+                json.dump(self.chrome_trace(), dump_file)
+            else:
+                dump_file.write("\n".join(self.collapsed_stacks()) + "\n")
+
+
+PROFILER = Profiler()
+
+
+def register(owner, names):
+    PROFILER.register(owner, names)
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+""" Decisions of a player
+
+The GameEngine asks the strategy of a player every time there is a choice
+to make, the GUI implements it with dialogs, bots with a few rules.
+"""
+
+from . import Trade
+
+
+def mortgage_cheapest(engine, player, amount):
+    """ Cheapest properties first until the player can pay amount
+
+    Returns:
+        tiles (list of EngineTile)
+    """
+
+    chosen = []
+    money = player.get_balance()
+
+    possessions = sorted(
+        player.get_possessions(), key = lambda x: (x.get_mortgage(), x.get_board_pos())
+    )
+
+    for tile in possessions:
+        if money >= amount:
+            break
+
+        chosen.append(tile)
+        money += tile.get_mortgage()
+
+    return chosen
+
+
+class Strategy:
+    """ Base strategy: buy everything affordable, never build,
+    mortgage the cheapest properties first, never trade
+    """
+
+    def decide_buy(self, engine, player, tile):
+        """ Buy the tile the player landed on? Only asked when affordable
+
+        Returns: bool
+        """
+        return True
+
+    def decide_build(self, engine, player):
+        """ Houses and hotels to buy at the start of the player's turn
+
+        engine.get_buildable_tiles(player) gives the candidates
+
+        Returns:
+            tile2nb_houses (dict of EngineTile: int)
+            hotel_tiles (list of EngineTile), tiles with 4 houses
+        """
+        return {}, []
+
+    def decide_mortgage(self, engine, player, amount):
+        """ Properties to give back to the bank to pay amount
+
+        The engine completes with the cheapest ones if it's not enough
+
+        Returns:
+            tiles (list of EngineTile)
+        """
+        return mortgage_cheapest(engine, player, amount)
+
+    def propose_trades(self, engine, player):
+        """ Offers to make at the start of the player's turn
+
+        Returns:
+            offers (list of Trade.Offer), player is the proposer
+        """
+        return []
+
+    def accept_trade(self, engine, player, offer):
+        """ Accept an offer made to the player? Only asked for valid offers
+
+        Returns: bool
+        """
+        return False
+
+
+class ReserveStrategy(Strategy):
+    """ Buy and build while keeping some money
+
+    Args:
+        buy_reserve (int): money kept after buying a property
+        build_reserve (int): money kept after building, None to never build
+    """
+
+    def __init__(self, buy_reserve, build_reserve = None):
+        self.buy_reserve = buy_reserve
+        self.build_reserve = build_reserve
+
+    def decide_buy(self, engine, player, tile):
+        return player.get_balance() - tile.get_price() >= self.buy_reserve
+
+    def decide_build(self, engine, player):
+        """ Hotels on full tiles, then one house on each tile of the
+        complete groups
+        """
+
+        tile2nb_houses = {}
+        hotel_tiles = []
+
+        if self.build_reserve is None or not player.get_complete_groups():
+            return tile2nb_houses, hotel_tiles
+
+        money = player.get_balance() - self.build_reserve
+        tile2houses = engine.get_buildable_tiles(player)
+
+        for tile, nb_houses in tile2houses.items():
+            if nb_houses == 4 and tile.get_house_price() <= money:
+                hotel_tiles.append(tile)
+                money -= tile.get_house_price()
+
+        for tile, nb_houses in tile2houses.items():
+            if nb_houses < 4 and tile.get_house_price() <= money:
+                tile2nb_houses[tile] = 1
+                money -= tile.get_house_price()
+
+        return tile2nb_houses, hotel_tiles
+
+
+class TradingStrategy(ReserveStrategy):
+    """ ReserveStrategy that trades to complete groups
+
+    Makes the best offer of the TradeEvaluator candidates each turn and
+    accepts the offers that raise its score by min_gain
+
+    Args:
+        evaluator (Trade.TradeEvaluator): a default one when None
+        min_gain (float): score an offer must bring to the bot
+    """
+
+    def __init__(self, buy_reserve, build_reserve = None, evaluator = None, min_gain = 1):
+        super().__init__(buy_reserve, build_reserve)
+        self.evaluator = evaluator or Trade.TradeEvaluator()
+        self.min_gain = min_gain
+
+    def propose_trades(self, engine, player):
+        best_gain, best_offer = self.min_gain, None
+
+        for gain, offer in self.evaluator.candidates(engine, player, self.buy_reserve):
+            if gain > best_gain:
+                best_gain, best_offer = gain, offer
+
+        return [best_offer] if best_offer is not None else []
+
+    def accept_trade(self, engine, player, offer):
+        return self.evaluator.score(engine, player, offer) >= self.min_gain
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
-import sys
-
 from PyQt5.QtWidgets import (
     QGraphicsGridLayout,
+    QGraphicsItem,
     QGraphicsWidget,
     QGraphicsLinearLayout,
     QGraphicsTextItem,
@@ -10,22 +9,20 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QBrush, QColor, QPen
 
-import core
-import Board
-import Player
-import Token
+from . import Token
 
 
 class Tile(QGraphicsWidget):
     """ Tile class """
 
-    def __init__(self, name, board_pos, price,
+    def __init__(self, name, kind, board_pos, price,
                  rent, mortgage, players, color,
                  group_name, number_in_group,
                  house_price, parent,
     ):
         super().__init__(parent=parent)
         self.name = name
+        self.kind = kind
         self.board_pos = board_pos
         self.price = price
         self.rent =  rent
@@ -38,6 +35,14 @@ class Tile(QGraphicsWidget):
         self.house_price = house_price
         self.nb_houses = 0
         self.hotel = False
+        self.house_items = []
+        self.hotel_item = None
+        self.owner_marker = None
+        self.player2color = players
+
+        # drawn once in the static layer of the Board, hidden afterwards
+        self.static_items = []
+        self.static_cached = False
 
         self.layout = QGraphicsLinearLayout()
         self.token_layout = QGraphicsGridLayout()
@@ -49,26 +54,34 @@ class Tile(QGraphicsWidget):
         self.layout.setOrientation(Qt.Vertical)
 
         property_name = QGraphicsTextItem(self.name, parent=self.name_on_tile)
-        
-        if name in parent.properties:
-            if self.board_pos in core.PROPERTIES:
-                money_info = QGraphicsTextItem(f"Price: {self.price}", parent=self.info)
-                self.color_rect = self.color_tile(color)
+        property_name.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        self.static_items.append(property_name)
+
+        if kind == "property":
+            money_info = QGraphicsTextItem(f"Price: {self.price}", parent=self.info)
+            money_info.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+            self.static_items.append(money_info)
+            self.color_rect = self.color_tile(color)
+            self.build_owner_marker()
 
-            elif self.board_pos in core.SPECIAL_CASES:
-                if name == "Start":
-                    money_start = QGraphicsTextItem(f"Free monay: {self.price}", parent=self.info)
+            if house_price is not None:
+                self.build_development_items()
 
-                    for player, color in players.items():
-                        token = Token.Token(player, color)
-                        token.set_tile(self)
-                        self.tokens.append(token)
+        elif kind == "start":
+            money_start = QGraphicsTextItem(f"Free monay: {self.price}", parent=self.info)
+            self.static_items.append(money_start)
 
-                    self.display_game_pieces()
+            for player, color in players.items():
+                token = Token.Token(player, color)
+                token.set_tile(self)
+                self.tokens.append(token)
+
+            self.display_game_pieces()
+
+        elif kind == "tax":
+            money_tax = QGraphicsTextItem(f"Tax: -{self.price}", parent=self.info)
+            self.static_items.append(money_tax)
 
-                elif name in ["Income Tax", "Super Tax"]:
-                    money_tax = QGraphicsTextItem(f"Tax: -{self.price}", parent=self.info)
-            
         self.token_layout.setColumnMaximumWidth(0, 22)
         self.token_layout.setColumnMaximumWidth(1, 22)
         self.token_layout.setColumnMaximumWidth(2, 22)
@@ -80,6 +93,7 @@ class Tile(QGraphicsWidget):
         self.layout.addItem(self.token_layout)
         self.setLayout(self.layout)
         self.setContentsMargins(0, 0, 100, 0)
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
     def is_owned(self):
         if self.owner:
@@ -90,12 +104,28 @@ class Tile(QGraphicsWidget):
     def set_owner(self, player):
         self.owner = player
 
+        if self.owner_marker is not None:
+            owner_color = QColor()
+            owner_color.setNamedColor(self.player2color[player])
+            self.owner_marker.setBrush(QBrush(owner_color, style = Qt.SolidPattern))
+            self.owner_marker.show()
+
     def get_owner(self):
         return self.owner
 
     def remove_owner(self):
+        """ Back to the bank, the houses and the hotel go with it like in the engine """
+
         self.owner = False
 
+        if self.owner_marker is not None:
+            self.owner_marker.hide()
+
+        if self.nb_houses or self.hotel:
+            self.nb_houses = 0
+            self.hotel = False
+            self.display_development()
+
     def add_token(self, token):
         self.tokens.append(token)
 
@@ -107,16 +137,19 @@ class Tile(QGraphicsWidget):
 
     def add_houses(self, number):
         self.nb_houses += number
-        self.display_houses()
+        self.display_development()
 
     def add_hotel(self):
         self.nb_houses = 0
         self.hotel = True
-        self.display_hotel()
+        self.display_development()
 
     def get_name(self):
         return self.name
 
+    def get_kind(self):
+        return self.kind
+
     def get_board_pos(self):
         return self.board_pos
 
@@ -133,14 +166,6 @@ class Tile(QGraphicsWidget):
     def get_price(self):
         return self.price
 
-    def get_rent(self):
-        if self.hotel:
-            return self.rent * self.parent().hotel_multiplier
-        elif self.nb_houses:
-            return self.rent * self.parent().house2mutliplier[self.nb_houses]
-        else:
-            return self.rent
-    
     def get_mortgage(self):
         return self.mortgage
 
@@ -169,63 +194,116 @@ class Tile(QGraphicsWidget):
         """ Display the tokens on the tile according to their number
         
         i.e. if there's 4, i want a 2x2 grid
-             if there's 5 or more, i want a 3xn grid
+             if there's 5 or more, i want rows of 3, as many as needed
         """
 
-        if len(self.tokens) >= 4:
-            sub_layout = True
-            sub_pos = 0
-        else:
-            sub_layout = False
+        columns = 2 if len(self.tokens) == 4 else 3
 
         for i, token in enumerate(self.tokens):
-            if (len(self.tokens) == 4 and i >= 2) or (
-                len(self.tokens) >= 5 and i >= 3
-            ):
-                if sub_layout:
-                    self.token_layout.addItem(token, 1, sub_pos)
-                    sub_pos += 1
-            else:
-                self.token_layout.addItem(token, 0, i)
+            self.token_layout.addItem(token, *divmod(i, columns))
+
+    def build_owner_marker(self):
+        """ Bar in the color of the owner under the color of the tile """
 
-    def display_houses(self):
-        for i in range(self.nb_houses):
-            width, height = self.color_rect.boundingRect().getRect()[2:]
-            set_color = QColor()
-            set_color.setNamedColor("#00FF00")
+        width, height = self.color_rect.boundingRect().getRect()[2:]
+        self.owner_marker = QGraphicsRectItem(0, height - 6, width, 6)
+        self.owner_marker.setParentItem(self.color_rect)
+        self.owner_marker.hide()
+
+    def build_development_items(self):
+        """ The 4 houses and the hotel of the tile, hidden until built """
+
+        width, height = self.color_rect.boundingRect().getRect()[2:]
+
+        house_color = QColor()
+        house_color.setNamedColor("#00FF00")
+        house_brush = QBrush(house_color, style = Qt.Dense1Pattern)
+
+        for i in range(4):
             house = QGraphicsRectItem(width/4 * i + 5, height/4, width/4 - 10, height/2)
             house.setParentItem(self.color_rect)
-            house.setBrush(QBrush(set_color, style = Qt.Dense1Pattern))
+            house.setBrush(house_brush)
+            house.hide()
+            self.house_items.append(house)
+
+        rect_color = QColor()
+        rect_color.setNamedColor("#FF0000")
+        pen_color = QColor()
+        pen_color.setNamedColor("#00A500")
+        pen = QPen()
+        pen.setBrush(QBrush(pen_color))
+        pen.setWidth(2)
+
+        self.hotel_item = QGraphicsRectItem(width/4, height/4, width/2, height/2)
+        self.hotel_item.setParentItem(self.color_rect)
+        self.hotel_item.setBrush(QBrush(rect_color, style = Qt.Dense1Pattern))
+        self.hotel_item.setPen(pen)
+        self.hotel_item.hide()
+
+    def display_development(self):
+        """ Show as many houses as nb_houses, or the hotel """
+
+        for i, house in enumerate(self.house_items):
+            house.setVisible(not self.hotel and i < self.nb_houses)
+
+        if self.hotel_item is not None:
+            self.hotel_item.setVisible(self.hotel)
+
+    def set_development(self, nb_houses, hotel):
+        """ Show exactly nb_houses houses or the hotel, to resync the tile
+        with the engine after loading a game
+        """
+
+        self.nb_houses = nb_houses
+        self.hotel = hotel
+        self.display_development()
+
+    def get_dynamic_items(self):
+        """ Items changing during the game, kept out of the static layer """
 
-    def display_hotel(self):
-        if self.hotel:
-            width, height = self.color_rect.boundingRect().getRect()[2:]
-            houses = self.color_rect.childItems()
+        items = self.tokens + self.house_items
 
-            for house in houses:
-                house.setParentItem(None)
+        for item in (self.hotel_item, self.owner_marker):
+            if item is not None:
+                items.append(item)
 
-            rect_color = QColor()
-            rect_color.setNamedColor("#FF0000")
-            pen_color = QColor()
-            pen_color.setNamedColor("#00A500")
-            pen = QPen()
-            pen.setBrush(QBrush(pen_color))
-            pen.setWidth(2)
+        return items
+
+    def set_static_cached(self, cached):
+        """ Stop drawing the static content once the Board has it in its
+        static layer, only the dynamic items stay
+        """
+
+        self.static_cached = cached
+
+        # nothing left to cache, the tile would only blit an empty pixmap
+        self.setCacheMode(
+            QGraphicsItem.NoCache if cached else QGraphicsItem.DeviceCoordinateCache
+        )
+
+        for item in self.static_items:
+            item.setVisible(not cached)
+
+        if hasattr(self, "color_rect"):
+            if cached:
+                self.color_rect.setBrush(QBrush(Qt.NoBrush))
+                self.color_rect.setPen(QPen(Qt.NoPen))
+            else:
+                self.color_rect.setBrush(self.color_brush)
+                self.color_rect.setPen(QPen())
 
-            hotel = QGraphicsRectItem(width/4, height/4, width/2, height/2)
-            hotel.setParentItem(self.color_rect)
-            hotel.setBrush(QBrush(rect_color, style = Qt.Dense1Pattern))
-            hotel.setPen(pen)
+        self.update()
 
     def paint(self, painter, option, widget):
-        painter.drawRects(self.boundingRect())
+        if not self.static_cached:
+            painter.drawRects(self.boundingRect())
 
     def color_tile(self, color):
         set_color = QColor()
         set_color.setNamedColor(color)
         color_rect = QGraphicsRectItem(0, 0, 150, 25, parent=self.color_property)
-        color_rect.setBrush(QBrush(set_color, style = Qt.SolidPattern))
+        self.color_brush = QBrush(set_color, style = Qt.SolidPattern)
+        color_rect.setBrush(self.color_brush)
         return color_rect
 
 
@@ -1,5 +1,3 @@
-import sys
-
 from PyQt5.QtWidgets import (
     QGraphicsGridLayout,
     QGraphicsWidget,
@@ -10,9 +8,6 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QBrush, QColor
 
-import Player
-import Tile
-
 
 class Token(QGraphicsWidget):
     """ Player token class """
@@ -0,0 +1,298 @@
+""" Property trading between players
+
+An Offer exchanges properties and cash between two players still in the
+game. check_offer() tells why an offer can't be settled, the GameEngine
+settles the valid ones at once with GameEngine.trade.
+
+The TradeEvaluator scores offers for bots. The value of holding some
+tiles of a group only depends on which tiles are held, so it is computed
+once per board for every subset of every group. A score then only looks
+up the groups the offer touches.
+"""
+
+from . import rent_table
+
+
+# average sum of 2 dice, what a utility rent is multiplied by
+MEAN_DICE = 7
+
+
+class Offer:
+    """ Exchange proposed by a player to another one
+
+    Args:
+        proposer (Player)
+        receiver (Player)
+        give (list of EngineTile): tiles of the proposer for the receiver
+        take (list of EngineTile): tiles of the receiver for the proposer
+        cash (int): money from the proposer to the receiver, negative
+            when the receiver pays
+    """
+
+    __slots__ = ("proposer", "receiver", "give", "take", "cash")
+
+    def __init__(self, proposer, receiver, give = (), take = (), cash = 0):
+        self.proposer = proposer
+        self.receiver = receiver
+        self.give = list(give)
+        self.take = list(take)
+        self.cash = cash
+
+    def __repr__(self):
+        give = ", ".join(tile.get_name() for tile in self.give)
+        take = ", ".join(tile.get_name() for tile in self.take)
+
+        return (
+            f"Offer({self.proposer} gives [{give}] + {self.cash}"
+            f" to {self.receiver} for [{take}])"
+        )
+
+
+def check_offer(engine, offer):
+    """ Why the offer can't be settled
+
+    Both players must be in the game, own the tiles they give, have the
+    cash they give, and no tile of a traded group can have buildings
+
+    Returns:
+        str, None when the offer is valid
+    """
+
+    proposer, receiver = offer.proposer, offer.receiver
+
+    if proposer is receiver:
+        return "A player can't trade with themselves"
+
+    if proposer not in engine.ordered_players or receiver not in engine.ordered_players:
+        return "Both players must be in the game"
+
+    if not offer.give and not offer.take:
+        return "The offer has no property"
+
+    tiles = offer.give + offer.take
+
+    if len(set(tiles)) != len(tiles):
+        return "A property is in the offer twice"
+
+    for owned, owner in ((offer.give, proposer), (offer.take, receiver)):
+        for tile in owned:
+            if tile.get_owner() is not owner:
+                return f"{owner} doesn't own {tile.get_name()}"
+
+    board = engine.board
+
+    for group in {board.groups[tile.get_board_pos()] for tile in tiles}:
+        for board_pos in board.group_tiles[group]:
+            other = engine.tiles[board_pos]
+
+            if other.get_nb_houses() or other.has_hotel():
+                return f"{other.get_name()} has buildings, sell them first"
+
+    payer, cash = (proposer, offer.cash) if offer.cash >= 0 else (receiver, -offer.cash)
+
+    if payer.get_balance() < cash:
+        return f"{payer} can't pay {cash}"
+
+    return None
+
+
+class GroupValues:
+    """ Value of every subset of every group of a board
+
+    The tiles of a group are the bits of a mask, in the order of
+    board.group_tiles. For each group and mask:
+        income: expected rent per opponent turn, the group developed to
+            develop_level when complete and buildable
+        cost: price of that development
+        liquid: mortgage value of the tiles
+    """
+
+    def __init__(self, board, landing, develop_level):
+        rents = rent_table.for_board(board)
+        self.pos2bit = {}
+        self.income = []
+        self.cost = []
+        self.liquid = []
+
+        for group, positions in enumerate(board.group_tiles):
+            size = len(positions)
+            house_price = board.group_house_prices[group]
+            masks = range(1 << size)
+
+            for bit, board_pos in enumerate(positions):
+                self.pos2bit[board_pos] = 1 << bit
+
+            incomes = []
+            costs = []
+            liquids = []
+
+            for mask in masks:
+                owned = [board_pos for bit, board_pos in enumerate(positions) if mask >> bit & 1]
+                nb_owned = len(owned)
+                level = 0
+
+                if nb_owned == size and house_price is not None:
+                    level = develop_level
+
+                income = 0
+
+                for board_pos in owned:
+                    rent = rent_table.get_rent(board_pos, level, nb_owned, MEAN_DICE, rents)
+                    income += landing[board_pos] * rent
+
+                incomes.append(income)
+                costs.append(level * size * (house_price or 0))
+                liquids.append(sum(board.prices[board_pos] / 2 for board_pos in owned))
+
+            self.income.append(incomes)
+            self.cost.append(costs)
+            self.liquid.append(liquids)
+
+
+class TradeEvaluator:
+    """ Scores of offers for the players of a game
+
+    A holding is worth the rent it should collect from the opponents over
+    horizon turns, minus what it costs to develop, plus what it would
+    give back mortgaged. The score of an offer is the change of worth of
+    a player, cash included.
+
+    Args:
+        horizon (int): turns of each opponent the rents are counted for
+        develop_level (int): houses expected on the complete groups
+        landing (callable): board -> probability to land on each tile in
+            a turn, 1 / nb_tiles everywhere when None. markov gives the
+            exact ones of core.BOARD
+    """
+
+    def __init__(self, horizon = 30, develop_level = 3, landing = None):
+        self.horizon = horizon
+        self.develop_level = develop_level
+        self.landing = landing
+        self.key2values = {}
+
+    def values(self, board):
+        """ GroupValues of a board, built once per board """
+
+        if board.key not in self.key2values:
+            if self.landing is None:
+                landing = [1 / board.nb_tiles] * board.nb_tiles
+            else:
+                landing = list(self.landing(board))
+
+            self.key2values[board.key] = GroupValues(board, landing, self.develop_level)
+
+        return self.key2values[board.key]
+
+    def group_mask(self, values, player, group_name):
+        mask = 0
+
+        for tile in player.group2tiles.get(group_name, ()):
+            mask |= values.pos2bit[tile.get_board_pos()]
+
+        return mask
+
+    def score(self, engine, player, offer):
+        """ Change of worth of player if the offer is settled
+
+        Returns:
+            float, 0 for a player not in the offer
+        """
+
+        if player is offer.proposer:
+            lost, gained, cash = offer.give, offer.take, -offer.cash
+        elif player is offer.receiver:
+            lost, gained, cash = offer.take, offer.give, offer.cash
+        else:
+            return 0
+
+        board = engine.board
+        values = self.values(board)
+        scale = self.horizon * (len(engine.ordered_players) - 1)
+        group2masks = {}
+
+        for tiles, gain in ((lost, False), (gained, True)):
+            for tile in tiles:
+                board_pos = tile.get_board_pos()
+                group = board.groups[board_pos]
+
+                if group not in group2masks:
+                    mask = self.group_mask(values, player, tile.get_group())
+                    group2masks[group] = [mask, mask]
+
+                if gain:
+                    group2masks[group][1] |= values.pos2bit[board_pos]
+                else:
+                    group2masks[group][1] &= ~values.pos2bit[board_pos]
+
+        score = cash
+
+        for group, (old, new) in group2masks.items():
+            income, cost, liquid = values.income[group], values.cost[group], values.liquid[group]
+            score += (
+                scale * (income[new] - income[old])
+                - (cost[new] - cost[old])
+                + liquid[new] - liquid[old]
+            )
+
+        return score
+
+    def candidates(self, engine, player, reserve = 0):
+        """ Offers of player to complete its groups
+
+        For every opponent: the tiles of the opponent in a group the player
+        has started, for nothing or for the tiles of the player in a group
+        the opponent has started. The cash shares the gain of both players
+        equally, as far as they can pay while keeping reserve. Only offers
+        that make both players better off in total are kept.
+
+        Yields:
+            (score of player, Offer)
+        """
+
+        board = engine.board
+        groups = board.groups
+
+        for opponent in engine.ordered_players:
+            if opponent is player:
+                continue
+
+            wanted = [
+                tiles for group, tiles in opponent.group2tiles.items()
+                if tiles and player.group2tiles.get(group)
+            ]
+            given = [[]] + [
+                tiles for group, tiles in player.group2tiles.items()
+                if tiles and opponent.group2tiles.get(group)
+            ]
+
+            for take in wanted:
+                for give in given:
+                    if give and groups[give[0].get_board_pos()] == groups[take[0].get_board_pos()]:
+                        continue
+
+                    offer = Offer(player, opponent, give, take)
+
+                    if check_offer(engine, offer) is not None:
+                        continue
+
+                    gain = self.score(engine, player, offer)
+                    opponent_gain = self.score(engine, opponent, offer)
+
+                    if gain + opponent_gain <= 0:
+                        continue
+
+                    cash = round((gain - opponent_gain) / 2)
+                    cash = min(cash, player.get_balance() - reserve)
+                    cash = max(cash, reserve - opponent.get_balance())
+                    offer.cash = cash
+
+                    if gain - cash > 0 and opponent_gain + cash > 0:
+                        yield gain - cash, offer
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+""" Monopoly game
+
+The rules (core, GameEngine, Strategy, tournament...) don't import PyQt5,
+only the widgets (Monopoly, Board, Tile, Token, MainWindow...) do.
+"""
@@ -0,0 +1,440 @@
+""" Board definitions compiled into flat lookup tables
+
+An edition of the board is a JSON file of lib/boards: its color groups,
+its decks of cards and its tiles in board order. It is compiled once
+into lists indexed by board position (name, kind, price, rent, group,
+grid coordinates...) plus the tables of the groups and of the cards, so
+the engine, the rent table and the widgets never search the definition. The compiled tables are cached on
+disk, keyed by a hash of the file and of the compiler.
+
+The board is drawn as a rectangle of width tiles from Start to the next
+corner and height tiles up to the one after, a square by default. Any
+even number of tiles is valid, variant() makes oversized boards out of
+an edition for load tests.
+"""
+
+from collections import namedtuple
+import json
+import os
+
+from . import cache
+
+
+BOARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "boards")
+COMPILER_VERSION = 4
+
+TILE_KINDS = [
+    "start", "property", "chance", "community_chest",
+    "tax", "jail", "free_parking", "go_to_jail",
+]
+GROUP_KINDS = ["street", "station", "utility"]
+
+# tiles drawing a card from the deck of their kind
+DECK_KINDS = ["chance", "community_chest"]
+
+# value of a card by action: position of the tile for move_to and
+# move_back_to, steps for move_by, money for the others, 0 when unused.
+# move_to goes forward past Start, move_back_to goes backward and never
+# passes it
+CARD_ACTIONS = [
+    "move_to", "move_by", "go_to_jail", "pay", "collect", "pay_each", "collect_each",
+    "jail_card", "move_back_to",
+]
+MOVE_TO_ACTIONS = ["move_to", "move_back_to"]
+
+# tiles found once on every board, None when a board has no such tile
+SPECIAL_KINDS = {
+    "start": True,
+    "jail": True,
+    "free_parking": False,
+    "go_to_jail": False,
+}
+
+BoardTables = namedtuple("BoardTables", [
+    "key", "name", "nb_tiles", "width", "height",
+    # per board position
+    "names", "kinds", "prices", "rents", "colors", "groups", "values", "grid",
+    # per group, in the order of the definition
+    "group_names", "group_colors", "group_kinds", "group_sizes",
+    "group_house_prices", "group_tiles", "color2group",
+    "house_multipliers", "hotel_multiplier",
+    "start_pos", "jail_pos", "free_parking_pos", "go_to_jail_pos", "salary",
+    # per card, the decks list the cards of each kind of DECK_KINDS
+    "card_texts", "card_actions", "card_values", "deck_cards",
+])
+
+
+def grid_position(board_pos, width, height):
+    """ Row and column of a tile in the grid of the board
+
+    Start is the bottom right corner, the board goes clockwise: bottom
+    row to the left, left column up, top row to the right, right column
+    down
+
+    Args:
+        board_pos (int)
+        width (int): steps from Start to the bottom left corner
+        height (int): steps from the bottom left to the top left corner
+    Returns:
+        (row, column)
+    """
+
+    if board_pos <= width:
+        return height, width - board_pos
+    if board_pos <= width + height:
+        return width + height - board_pos, 0
+    if board_pos <= 2 * width + height:
+        return 0, board_pos - width - height
+
+    return board_pos - 2 * width - height, width
+
+
+def board_shape(nb_tiles, width = None):
+    """ Width and height of a board of nb_tiles, as square as possible
+    when the width isn't given
+
+    Raises:
+        ValueError: no rectangle has this number of tiles
+    """
+
+    half = nb_tiles // 2
+
+    if nb_tiles < 4 or nb_tiles % 2:
+        raise ValueError(f"a board needs an even number of tiles, got {nb_tiles}")
+
+    if width is None:
+        width = (half + 1) // 2
+
+    if not 0 < width < half:
+        raise ValueError(f"a board of {nb_tiles} tiles can't be {width} tiles wide")
+
+    return width, half - width
+
+
+def compile_board(definition):
+    """ Lookup tables of a board definition
+
+    Args:
+        definition (dict): content of a board file
+    Returns:
+        dict of the BoardTables fields but the key, JSON serializable
+    Raises:
+        ValueError: when the definition isn't a valid board
+    """
+
+    groups = definition["groups"]
+    tiles = definition["tiles"]
+    nb_tiles = len(tiles)
+    width, height = board_shape(nb_tiles, definition.get("width"))
+
+    if tiles[0]["kind"] != "start":
+        raise ValueError("a board starts with its tile of kind start")
+
+    color2group = {}
+
+    for index, group in enumerate(groups):
+        if group["kind"] not in GROUP_KINDS:
+            raise ValueError(f"unknown kind of group {group['kind']!r}")
+
+        if group["color"] in color2group:
+            raise ValueError(f"two groups have the color {group['color']}")
+
+        color2group[group["color"]] = index
+
+    compiled = {
+        "name": definition.get("name", ""),
+        "nb_tiles": nb_tiles,
+        "width": width,
+        "height": height,
+        "names": [],
+        "kinds": [],
+        "prices": [],
+        "rents": [],
+        "colors": [],
+        "groups": [],
+        "values": [],
+        "grid": [],
+        "group_names": [group["name"] for group in groups],
+        "group_colors": [group["color"] for group in groups],
+        "group_kinds": [group["kind"] for group in groups],
+        "group_sizes": [0] * len(groups),
+        "group_house_prices": [group.get("house_price") for group in groups],
+        "group_tiles": [[] for group in groups],
+        "color2group": color2group,
+        "house_multipliers": list(definition["house_multipliers"]),
+        "hotel_multiplier": definition["hotel_multiplier"],
+    }
+
+    for kind in SPECIAL_KINDS:
+        compiled[f"{kind}_pos"] = None
+
+    for board_pos, tile in enumerate(tiles):
+        kind = tile["kind"]
+
+        if kind not in TILE_KINDS:
+            raise ValueError(f"unknown kind of tile {kind!r} at {board_pos}")
+
+        price, rent, color, group = None, None, None, None
+
+        if kind == "property":
+            if tile["color"] not in color2group:
+                raise ValueError(f"{tile['name']} has no group of color {tile['color']}")
+
+            price = tile["price"]
+            rent = tile["rent"]
+            color = tile["color"]
+            group = color2group[color]
+            compiled["group_sizes"][group] += 1
+            compiled["group_tiles"][group].append(board_pos)
+
+        elif kind in SPECIAL_KINDS:
+            if compiled[f"{kind}_pos"] is not None:
+                raise ValueError(f"more than one tile of kind {kind}")
+
+            compiled[f"{kind}_pos"] = board_pos
+
+        compiled["names"].append(tile["name"])
+        compiled["kinds"].append(kind)
+        compiled["prices"].append(price)
+        compiled["rents"].append(rent)
+        compiled["colors"].append(color)
+        compiled["groups"].append(group)
+        compiled["values"].append(tile.get("value"))
+        compiled["grid"].append(grid_position(board_pos, width, height))
+
+    for kind, required in SPECIAL_KINDS.items():
+        if required and compiled[f"{kind}_pos"] is None:
+            raise ValueError(f"a board needs a tile of kind {kind}")
+
+    if 0 in compiled["group_sizes"]:
+        empty = compiled["group_names"][compiled["group_sizes"].index(0)]
+        raise ValueError(f"the group {empty} has no tile")
+
+    names = [name for name, kind in zip(compiled["names"], compiled["kinds"]) if kind == "property"]
+
+    if len(set(names)) != len(names):
+        raise ValueError("two properties have the same name")
+
+    compiled["salary"] = compiled["values"][compiled["start_pos"]]
+    compile_decks(definition.get("decks", {}), compiled)
+
+    return compiled
+
+
+def compile_decks(decks, compiled):
+    """ Add the card tables of the decks of a definition to compiled
+
+    Raises:
+        ValueError: unknown deck, action or tile
+    """
+
+    name2pos = {}
+
+    for board_pos, name in enumerate(compiled["names"]):
+        name2pos.setdefault(name, board_pos)
+
+    compiled["card_texts"] = []
+    compiled["card_actions"] = []
+    compiled["card_values"] = []
+    compiled["deck_cards"] = {kind: [] for kind in DECK_KINDS}
+
+    for kind, cards in decks.items():
+        if kind not in DECK_KINDS:
+            raise ValueError(f"unknown deck {kind!r}")
+
+        for card in cards:
+            action = card["action"]
+
+            if action not in CARD_ACTIONS:
+                raise ValueError(f"unknown action {action!r} of the card {card['text']!r}")
+
+            if action in MOVE_TO_ACTIONS:
+                if card["tile"] not in name2pos:
+                    raise ValueError(f"the card {card['text']!r} goes to no tile")
+
+                value = name2pos[card["tile"]]
+            elif action == "move_by":
+                value = card["steps"]
+            else:
+                value = card.get("amount", 0)
+
+            compiled["deck_cards"][kind].append(len(compiled["card_texts"]))
+            compiled["card_texts"].append(card["text"])
+            compiled["card_actions"].append(action)
+            compiled["card_values"].append(value)
+
+
+def variant(definition, nb_tiles, width = None):
+    """ Board of any size made of laps of an edition
+
+    The Start, jail, Free Parking and Go to Jail tiles of the edition go
+    in the corners, its other tiles are repeated in order along the
+    sides. Every lap has its own groups, with the lap in the names and a
+    color of their own, the color of the edition with the lap in the low
+    bits or the next free one, so the groups keep the size and the rents
+    of the edition. The cards move to the tiles of the first lap, the ones
+    moving to a tile left out of a small board are dropped
+
+    Args:
+        definition (dict): content of a board file
+        nb_tiles (int)
+        width (int): see board_shape
+    Returns:
+        dict, a board definition
+    """
+
+    width, height = board_shape(nb_tiles, width)
+    kind2tile = {
+        tile["kind"]: tile for tile in definition["tiles"] if tile["kind"] in SPECIAL_KINDS
+    }
+    others = [tile for tile in definition["tiles"] if tile["kind"] not in SPECIAL_KINDS]
+    corners = {
+        board_pos: kind2tile[kind]
+        for board_pos, kind in zip(
+            [0, width, width + height, 2 * width + height],
+            ["start", "jail", "free_parking", "go_to_jail"],
+        )
+        if kind in kind2tile
+    }
+
+    color2group = {group["color"]: group for group in definition["groups"]}
+    used_colors = {color.lower() for color in color2group}
+    groups = {}
+    tiles = []
+    index = 0
+
+    for board_pos in range(nb_tiles):
+        if board_pos in corners:
+            tiles.append(dict(corners[board_pos]))
+            continue
+
+        lap, tile = divmod(index, len(others))
+        tile = dict(others[tile])
+        index += 1
+
+        if tile["kind"] == "property":
+            key = (tile["color"], lap)
+
+            if key not in groups:
+                color = tile["color"]
+
+                if lap:
+                    value = int(color[1:], 16) ^ lap
+
+                    while f"#{value:06x}" in used_colors:
+                        value = (value + 1) & 0xFFFFFF
+
+                    color = f"#{value:06x}"
+                    used_colors.add(color)
+
+                group = dict(color2group[tile["color"]], color = color)
+
+                if lap:
+                    group["name"] = f"{group['name']} {lap + 1}"
+
+                groups[key] = group
+
+            tile["color"] = groups[key]["color"]
+
+            if lap:
+                tile["name"] = f"{tile['name']} {lap + 1}"
+
+        tiles.append(tile)
+
+    names = {tile["name"] for tile in tiles}
+
+    return {
+        "name": f"{definition.get('name', '')} {nb_tiles}".strip(),
+        "width": width,
+        "house_multipliers": definition["house_multipliers"],
+        "hotel_multiplier": definition["hotel_multiplier"],
+        "groups": list(groups.values()),
+        "decks": {
+            kind: [
+                card for card in cards
+                if card["action"] not in MOVE_TO_ACTIONS or card["tile"] in names
+            ]
+            for kind, cards in definition.get("decks", {}).items()
+        },
+        "tiles": tiles,
+    }
+
+
+def board_path(edition):
+    """ File of an edition, a path is used as is """
+
+    if os.path.sep in edition or edition.endswith(".json"):
+        return edition
+
+    return os.path.join(BOARDS_DIR, f"{edition}.json")
+
+
+def tables(definition, use_cache = True):
+    """ Compiled tables of a board definition, from the disk cache when possible
+
+    Args:
+        definition (dict): content of a board file
+    Returns:
+        BoardTables
+    """
+
+    key = cache.content_key(definition, COMPILER_VERSION)
+    compiled = cache.load("board", key) if use_cache else None
+
+    if compiled is None:
+        compiled = compile_board(definition)
+        cache.save("board", key, compiled)
+
+    compiled["grid"] = [tuple(position) for position in compiled["grid"]]
+
+    return BoardTables(key = key, **compiled)
+
+
+def read_definition(edition):
+    with open(board_path(edition), encoding = "utf-8") as board_file:
+        return json.load(board_file)
+
+
+def load(edition = "classic", use_cache = True):
+    """ Compiled tables of an edition
+
+    Args:
+        edition (str): name of a file of lib/boards or path of a board file
+    Returns:
+        BoardTables
+    """
+
+    return tables(read_definition(edition), use_cache)
+
+
+def load_variant(edition, nb_tiles, width = None, use_cache = True):
+    """ Compiled tables of a variant of nb_tiles of an edition, see variant """
+
+    return tables(variant(read_definition(edition), nb_tiles, width), use_cache)
+
+
+def main():
+    # only for the command line, the engine imports this module
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Print the tiles of a board or make a variant")
+    parser.add_argument("edition", nargs = "?", default = "classic")
+    parser.add_argument(
+        "--variant", type = int, metavar = "NB_TILES",
+        help = "print a board of NB_TILES tiles made of laps of the edition"
+    )
+    parser.add_argument("--width", type = int, help = "tiles of the bottom row of the variant")
+    args = parser.parse_args()
+
+    if args.variant is not None:
+        definition = read_definition(args.edition)
+        print(json.dumps(variant(definition, args.variant, args.width), indent = 1))
+        return
+
+    board = load(args.edition)
+
+    for board_pos in range(board.nb_tiles):
+        print(f"{board_pos:>2} {board.kinds[board_pos]:<16} {board.names[board_pos]}")
+
+if __name__ == "__main__":
+    main()
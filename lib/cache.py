@@ -0,0 +1,65 @@
+""" On disk cache for values computed from the board definition
+
+Values are stored as JSON files named after a hash of what they were
+computed from, a change of the data gives a new key so nothing has to be
+invalidated by hand.
+"""
+
+import hashlib
+import json
+import os
+
+
+CACHE_DIR = os.environ.get(
+    "MONOPOLY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "monopoly")
+)
+
+
+def content_key(*values):
+    """ Hash of JSON serializable values
+
+    Returns:
+        key (str)
+    """
+
+    dump = json.dumps(values, sort_keys = True, default = str)
+    return hashlib.sha1(dump.encode()).hexdigest()
+
+
+def cache_path(kind, key):
+    return os.path.join(CACHE_DIR, f"{kind}-{key}.json")
+
+
+def load(kind, key):
+    """ Cached value or None if missing/unreadable """
+
+    try:
+        with open(cache_path(kind, key)) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save(kind, key, value):
+    """ Write the value, a read only disk only means no cache """
+
+    path = cache_path(kind, key)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok = True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "w") as cache_file:
+            json.dump(value, cache_file)
+
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+""" Exact landing probabilities of the board with a Markov chain
+
+A state is the position of the player and the number of doubles rolled
+in the current turn, plus the 3 turns a player can spend in jail. One
+step of the chain is one roll of the dice, with the same rules as the
+GameEngine: 3 doubles or the Go to Jail tile send to jail, a double or
+the end of the jail time free the player without moving. The cards of a
+deck are drawn with the same probability, the moves they give are
+followed, Get out of jail cards are ignored.
+
+The solution only depends on the board definition so it is cached on
+disk, keyed by the hash of the board file.
+"""
+
+from itertools import product
+
+import numpy as np
+
+from . import board_data
+from . import cache
+from . import core
+from . import rent_table
+
+
+NB_TILES = core.BOARD.nb_tiles
+JAIL_POS = core.BOARD.jail_pos
+GO_TO_JAIL_POS = core.BOARD.go_to_jail_pos
+JAIL_TURNS = 3
+MAX_DOUBLES = 3
+
+MODEL_VERSION = 3
+
+
+def free_state(board_pos, doubles):
+    return board_pos * MAX_DOUBLES + doubles
+
+
+def jail_state(jail_status):
+    """ jail_status goes from JAIL_TURNS down to 1 like Player.jail_status """
+    return NB_TILES * MAX_DOUBLES + JAIL_TURNS - jail_status
+
+
+NB_STATES = NB_TILES * MAX_DOUBLES + JAIL_TURNS
+
+
+def dice_outcomes():
+    """ All the rolls of 2 dice
+
+    Returns:
+        list of (sum_dice, double, probability)
+    """
+
+    return [
+        (die1 + die2, die1 == die2, 1 / 36)
+        for die1, die2 in product(range(1, 7), repeat = 2)
+    ]
+
+
+def card_moves(board_pos):
+    """ Where a player landing on board_pos ends up after a card
+
+    Returns:
+        list of (board_pos, to_jail, probability), the tile itself with
+        probability 1 when it isn't a deck
+    """
+
+    board = core.BOARD
+    cards = board.deck_cards.get(board.kinds[board_pos], ())
+
+    if not cards:
+        return [(board_pos, False, 1)]
+
+    moves = []
+
+    for card in cards:
+        action, value = board.card_actions[card], board.card_values[card]
+
+        if action in board_data.MOVE_TO_ACTIONS:
+            moves.append((value, False, 1 / len(cards)))
+        elif action == "move_by":
+            moves.append(((board_pos + value) % NB_TILES, False, 1 / len(cards)))
+        else:
+            moves.append((board_pos, action == "go_to_jail", 1 / len(cards)))
+
+    return moves
+
+
+def transition_matrix():
+    """ Transition and landing matrices of one roll
+
+    Returns:
+        transitions (np.ndarray): (states, states), row = from
+        landings (np.ndarray): (states, tiles), probability to land on a tile
+        landings_dice (np.ndarray): (states, tiles), same weighted by the
+            dice sum, for the rents multiplying the roll
+    """
+
+    transitions = np.zeros((NB_STATES, NB_STATES))
+    landings = np.zeros((NB_STATES, NB_TILES))
+    landings_dice = np.zeros((NB_STATES, NB_TILES))
+    out_of_jail = free_state(JAIL_POS, 0)
+
+    for board_pos, doubles in product(range(NB_TILES), range(MAX_DOUBLES)):
+        state = free_state(board_pos, doubles)
+
+        for sum_dice, double, roll_probability in dice_outcomes():
+            landed_pos = (board_pos + sum_dice) % NB_TILES
+            landings[state, landed_pos] += roll_probability
+            landings_dice[state, landed_pos] += roll_probability * sum_dice
+
+            for new_pos, card_jail, card_probability in card_moves(landed_pos):
+                probability = roll_probability * card_probability
+
+                if new_pos != landed_pos:
+                    landings[state, new_pos] += probability
+                    landings_dice[state, new_pos] += probability * sum_dice
+
+                if (
+                    card_jail or new_pos == GO_TO_JAIL_POS
+                    or (double and doubles + 1 == MAX_DOUBLES)
+                ):
+                    new_state = jail_state(JAIL_TURNS)
+                elif double:
+                    new_state = free_state(new_pos, doubles + 1)
+                else:
+                    new_state = free_state(new_pos, 0)
+
+                transitions[state, new_state] += probability
+
+    for jail_status in range(JAIL_TURNS, 0, -1):
+        state = jail_state(jail_status)
+
+        for sum_dice, double, probability in dice_outcomes():
+            if double or jail_status == 1:
+                new_state = out_of_jail
+            else:
+                new_state = jail_state(jail_status - 1)
+
+            transitions[state, new_state] += probability
+
+    return transitions, landings, landings_dice
+
+
+def steady_state(transitions):
+    """ Stationary distribution of the chain
+
+    Solve pi P = pi with sum(pi) = 1, the last balance equation is
+    replaced by the normalisation
+
+    Returns:
+        pi (np.ndarray)
+    """
+
+    nb_states = transitions.shape[0]
+    system = transitions.T - np.eye(nb_states)
+    system[-1] = 1
+    target = np.zeros(nb_states)
+    target[-1] = 1
+
+    return np.linalg.solve(system, target)
+
+
+def turn_starts(pi):
+    """ Probability that a roll is the first one of a turn
+
+    After a roll without double or a roll sending to jail the turn is over
+    """
+
+    starts = np.zeros(NB_STATES)
+    starts[free_state(np.arange(NB_TILES), 0)] = 1
+    starts[jail_state(np.arange(1, JAIL_TURNS + 1))] = 1
+
+    return pi @ starts
+
+
+def rent_levels():
+    """ Rent table of rent_table as an array
+
+    Returns:
+        np.ndarray of shape (NB_TILES, NB_LEVELS, NB_COUNTS)
+    """
+
+    return np.array(rent_table.RENT_TABLE, dtype = float).reshape(
+        NB_TILES, rent_table.NB_LEVELS, rent_table.NB_COUNTS
+    )
+
+
+def board_key():
+    """ Cache key of the board definition and of the model """
+
+    return cache.content_key(
+        MODEL_VERSION,
+        core.BOARD.key,
+        list(rent_table.RENT_TABLE),
+        rent_table.DICE_RENT,
+    )
+
+
+def compute():
+    """ Solve the chain
+
+    Returns:
+        dict with
+            landing: probability to land on each tile during a turn
+            expected_rent: rent collected per opponent turn for each tile,
+                level of development and number owned in the group,
+                (NB_TILES, NB_LEVELS, NB_COUNTS) like the rent table
+            rolls_per_turn: average number of rolls in a turn
+    """
+
+    transitions, landings, landings_dice = transition_matrix()
+    pi = steady_state(transitions)
+    starts = turn_starts(pi)
+
+    landing = (pi @ landings) / starts
+    landing_dice = (pi @ landings_dice) / starts
+    weights = np.where(rent_table.DICE_RENT, landing_dice, landing)
+    expected_rent = weights[:, None, None] * rent_levels()
+
+    return {
+        "landing": landing.tolist(),
+        "expected_rent": expected_rent.tolist(),
+        "rolls_per_turn": float(1 / starts),
+    }
+
+
+def solve(use_cache = True):
+    """ Cached version of compute """
+
+    key = board_key()
+
+    if use_cache:
+        result = cache.load("markov", key)
+
+        if result is not None:
+            return result
+
+    result = compute()
+    cache.save("markov", key, result)
+
+    return result
+
+
+def landing_probabilities(use_cache = True):
+    """ Returns: np.ndarray of NB_TILES probabilities to land on a tile per turn """
+    return np.array(solve(use_cache)["landing"])
+
+
+def expected_rent(use_cache = True):
+    """ Returns: np.ndarray (NB_TILES, NB_LEVELS, NB_COUNTS), 0 when impossible """
+    return np.array(solve(use_cache)["expected_rent"])
+
+
+def main():
+    result = solve()
+
+    for board_pos, probability in enumerate(result["landing"]):
+        print(f"{board_pos:>2} {probability:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+""" Rent of every tile precomputed in one flat table
+
+Index by board position, level of development (0 to 4 houses, 5 for a
+hotel) and number of tiles of the group owned by the owner:
+    RENT_TABLE[rent_index(board_pos, level, nb_owned, NB_COUNTS)]
+
+Colored properties get double rent without houses when the group is
+complete, stations double with each station owned, utilities hold the
+multiplier of the dice sum.
+
+The module tables are the ones of core.BOARD, for_board() builds them
+for any other board.
+"""
+
+from array import array
+from collections import namedtuple
+
+from . import core
+
+
+HOTEL_LEVEL = 5
+NB_LEVELS = HOTEL_LEVEL + 1
+
+UTILITY2DICE_MULTIPLIER = {1: 4, 2: 10}
+
+RentTable = namedtuple("RentTable", ["table", "dice_rent", "nb_counts"])
+
+
+def rent_index(board_pos, level, nb_owned, nb_counts):
+    return (board_pos * NB_LEVELS + level) * nb_counts + nb_owned
+
+
+def level_of(nb_houses, hotel):
+    """ Level of development of a tile """
+    return HOTEL_LEVEL if hotel else nb_houses
+
+
+def build_rent_table(board = None):
+    """ Rent for every tile x level x number owned in the group
+
+    Args:
+        board (board_data.BoardTables): core.BOARD when None
+    Returns:
+        (table, dice_rent):
+            table (array of int), 0 where the combination can't happen
+            dice_rent (list of bool), True when the rent is a multiplier
+                of the dice sum
+    """
+
+    board = board or core.BOARD
+    nb_counts = max(board.group_sizes, default = 0) + 1
+    table = array("l", [0]) * (board.nb_tiles * NB_LEVELS * nb_counts)
+    dice_rent = [False] * board.nb_tiles
+
+    for board_pos, group in enumerate(board.groups):
+        if group is None:
+            continue
+
+        base_rent = board.rents[board_pos]
+        kind = board.group_kinds[group]
+        number = board.group_sizes[group]
+
+        for nb_owned in range(1, number + 1):
+            index = rent_index(board_pos, 0, nb_owned, nb_counts)
+
+            if kind == "station":
+                table[index] = base_rent * 2 ** (nb_owned - 1)
+
+            elif kind == "utility":
+                # more utilities than on the classic board keep the last multiplier
+                dice_rent[board_pos] = True
+                table[index] = base_rent * UTILITY2DICE_MULTIPLIER[
+                    min(nb_owned, len(UTILITY2DICE_MULTIPLIER))
+                ]
+
+            else:
+                # houses stay when another tile of the group is mortgaged
+                if nb_owned < number:
+                    table[index] = base_rent
+                else:
+                    table[index] = base_rent * 2
+
+                for nb_houses, multiplier in enumerate(board.house_multipliers, 1):
+                    table[rent_index(board_pos, nb_houses, nb_owned, nb_counts)] = (
+                        base_rent * multiplier
+                    )
+
+                table[rent_index(board_pos, HOTEL_LEVEL, nb_owned, nb_counts)] = (
+                    base_rent * board.hotel_multiplier
+                )
+
+    return table, dice_rent
+
+
+key2rent_table = {}
+
+
+def for_board(board):
+    """ Tables of a board, built once per board
+
+    Args:
+        board (board_data.BoardTables)
+    Returns:
+        RentTable
+    """
+
+    if board.key not in key2rent_table:
+        table, dice_rent = build_rent_table(board)
+        key2rent_table[board.key] = RentTable(
+            table, dice_rent, max(board.group_sizes, default = 0) + 1
+        )
+
+    return key2rent_table[board.key]
+
+
+RENT_TABLE, DICE_RENT, NB_COUNTS = DEFAULT = for_board(core.BOARD)
+
+
+def get_rent(board_pos, level, nb_owned, sum_dice = 0, rents = DEFAULT):
+    """ Rent to pay when landing on a tile
+
+    Args:
+        board_pos (int)
+        level (int): see level_of
+        nb_owned (int): tiles of the group owned by the owner
+        sum_dice (int): roll that brought the player, for utilities
+        rents (RentTable): tables of the board of the tile
+    Returns:
+        rent (int)
+    """
+
+    table, dice_rent, nb_counts = rents
+    rent = table[rent_index(board_pos, level, nb_owned, nb_counts)]
+
+    if dice_rent[board_pos]:
+        return rent * sum_dice
+
+    return rent
+
+
+def main():
+    pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+""" Bot tournament
+
+Round robin between named bots, games are played headless with the
+GameEngine over a pool of processes. Results don't depend on the number
+of workers or the chunk size: every game gets its own Dice stream split
+from the tournament seed by match and game number. The event logs of the
+games can be archived, one file per chunk.
+"""
+
+from collections import Counter
+from itertools import combinations
+import os
+
+from . import Dice
+from . import EventLog
+from . import GameEngine
+from . import Player
+from . import Strategy
+
+
+BOTS = {
+    "greedy": Strategy.ReserveStrategy(buy_reserve = 0, build_reserve = 0),
+    "builder": Strategy.ReserveStrategy(buy_reserve = 100, build_reserve = 150),
+    "cautious": Strategy.ReserveStrategy(buy_reserve = 400, build_reserve = 500),
+    "passive": Strategy.ReserveStrategy(buy_reserve = 0),
+    "trader": Strategy.TradingStrategy(buy_reserve = 100, build_reserve = 150),
+}
+
+
+def play_game(bot_names, dice, max_turns = 2000, board = None, log = False):
+    """ Play one game between bots
+
+    Args:
+        bot_names (list of str): one player per name
+        dice (Dice.Dice)
+        max_turns (int): rolls before calling it a draw
+        board (board_data.BoardTables): core.BOARD when None
+        log (bool): keep the event log of the game
+    Returns:
+        (winner, turns, log): name of the winning bot or None for a draw,
+            log is None when not kept
+    """
+
+    player2bot = {
+        Player.Player(f"{name}-{seat}"): BOTS[name]
+        for seat, name in enumerate(bot_names)
+    }
+    player2name = {player: name for player, name in zip(player2bot, bot_names)}
+
+    engine = GameEngine.GameEngine(list(player2bot), player2bot, dice, board, log)
+    engine.order_players()
+
+    for turn in range(max_turns):
+        engine.play_turn()
+
+        if engine.is_over():
+            return player2name[engine.winner], turn + 1, engine.log
+
+    return None, max_turns, engine.log
+
+
+def play_chunk(bot_names, first_game, nb_games, dice, max_turns, archive_path = None,
+               board = None,
+):
+    """ Play a chunk of games in a worker
+
+    Args:
+        first_game (int): number of the first game of the chunk in the match
+        dice (Dice.Dice): stream of the match, game i uses dice.split(i)
+        archive_path (str): file to save the event logs, None to drop them
+        board (board_data.BoardTables): core.BOARD when None
+
+    Returns:
+        (bot_names, wins (Counter), draws, turns)
+    """
+
+    wins = Counter()
+    draws = 0
+    turns = 0
+    logs = []
+
+    for game in range(first_game, first_game + nb_games):
+        winner, game_turns, log = play_game(
+            bot_names, dice.split(game), max_turns, board, archive_path is not None
+        )
+        turns += game_turns
+
+        if archive_path is not None:
+            logs.append(log)
+
+        if winner is None:
+            draws += 1
+        else:
+            wins[winner] += 1
+
+    if archive_path is not None:
+        EventLog.save_archive(archive_path, logs)
+
+    return bot_names, wins, draws, turns
+
+
+def run_tournament(bot_names, nb_games, players_per_game = 2, seed = 0,
+                   chunk_size = 50, max_turns = 2000, workers = None, archive_dir = None,
+                   board = None,
+):
+    """ Round robin between the bots
+
+    Args:
+        bot_names (list of str): names from BOTS
+        nb_games (int): games per match
+        players_per_game (int)
+        seed (int): seed of the whole tournament, match i uses stream i
+        chunk_size (int): games sent to a worker at once
+        max_turns (int)
+        workers (int): processes, all the cores when None
+        archive_dir (str): directory of the event logs, chunk-i.mnpl per chunk
+        board (board_data.BoardTables): board of every game, core.BOARD when None
+    Yields:
+        (bot_names, wins, draws, turns) for every chunk, as they finish
+    """
+
+    unknown = [name for name in bot_names if name not in BOTS]
+
+    if unknown:
+        raise ValueError(f"Unknown bots: {', '.join(unknown)}, choose from {', '.join(BOTS)}")
+
+    if archive_dir is not None:
+        os.makedirs(archive_dir, exist_ok = True)
+
+    tournament_dice = Dice.Dice(seed)
+    tasks = []
+
+    for index, match in enumerate(combinations(bot_names, players_per_game)):
+        match_dice = tournament_dice.split(index)
+
+        for start in range(0, nb_games, chunk_size):
+            tasks.append((match, start, min(chunk_size, nb_games - start), match_dice))
+
+    # with its multiprocessing and logging it would double the import time
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [
+            executor.submit(
+                play_chunk, match, start, chunk_games, match_dice, max_turns,
+                archive_dir and os.path.join(archive_dir, f"chunk-{index}.mnpl"),
+                board,
+            )
+            for index, (match, start, chunk_games, match_dice) in enumerate(tasks)
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(bot_names, nb_games = 100, players_per_game = 2, seed = 0, workers = None,
+         archive_dir = None, board = None,
+):
+    """ Run the tournament and print the results per match """
+
+    match2results = {}
+
+    for match, wins, draws, turns in run_tournament(
+        bot_names, nb_games, players_per_game, seed,
+        workers = workers, archive_dir = archive_dir, board = board,
+    ):
+        results = match2results.setdefault(match, [Counter(), 0, 0, 0])
+        results[0].update(wins)
+        results[1] += draws
+        results[2] += turns
+        results[3] += sum(wins.values()) + draws
+
+    for match, (wins, draws, turns, games) in match2results.items():
+        scores = ", ".join(f"{name}: {wins[name]}" for name in match)
+        print(f"{' vs '.join(match)}: {scores}, draws: {draws}, turns/game: {turns / games:.0f}")
+
+if __name__ == "__main__":
+    main(list(BOTS))